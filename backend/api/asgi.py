@@ -0,0 +1,148 @@
+"""ASGI-обработчик с быстрыми маршрутами.
+
+Django 3.2 выполняет синхронные middleware и представления в одном
+потоке процесса, так что асинхронное представление за ними всё равно
+ждёт этот поток. Поэтому маршруты из api.fast_urls обрабатываются здесь,
+в цикле событий и без цепочки middleware, а остальные запросы уходят в
+обычный ASGIHandler. Кэши процесса заполняются при событии lifespan
+startup.
+
+Из middleware на быстрых маршрутах применяются только заголовки
+FAST_MIDDLEWARE (безопасность, CORS), если они включены в MIDDLEWARE.
+Метрики и лог запросов пишутся так же, как в
+QueryInstrumentationMiddleware, но без SQL-запросов: они выполняются
+только при промахе кэша и в другом потоке. Профилирование
+(ProfilingMiddleware) эти маршруты не охватывает.
+"""
+import functools
+import time
+
+from django.conf import settings
+from django.core.exceptions import RequestAborted
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.urls import Resolver404, get_resolver
+from django.utils.module_loading import import_string
+
+from backend.warm_up import warm_up
+
+from api import metrics
+from api.instrumentation import log_request
+from api.recipes.async_views import in_thread
+
+FAST_URLCONF = 'api.fast_urls'
+FAST_METHODS = frozenset(('GET', 'HEAD'))
+FAST_MIDDLEWARE = frozenset((
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+))
+
+
+def wants_html(scope):
+    """Браузеру отдаём API с интерфейсом DRF через обычный обработчик."""
+    return any(
+        name == b'accept' and b'text/html' in value
+        for name, value in scope['headers']
+    )
+
+
+class FastPathASGIHandler(ASGIHandler):
+
+    def __init__(self):
+        super().__init__()
+        self.fast_resolver = get_resolver(FAST_URLCONF)
+        # Методы process_request/process_response этих middleware только
+        # читают настройки и меняют заголовки, их можно вызывать в цикле
+        # событий.
+        self.fast_middleware = [
+            import_string(path)(lambda request: None)
+            for path in settings.MIDDLEWARE if path in FAST_MIDDLEWARE
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] == 'http' and scope['method'] in FAST_METHODS and (
+            not wants_html(scope)
+        ):
+            match = self.resolve_fast(scope)
+            if match is not None:
+                return await self.handle_fast(match, scope, receive, send)
+        return await super().__call__(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await in_thread(warm_up)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def resolve_fast(self, scope):
+        path = scope['path']
+        root_path = scope.get('root_path', '')
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        try:
+            return self.fast_resolver.resolve(path)
+        except Resolver404:
+            return None
+
+    async def handle_fast(self, match, scope, receive, send):
+        started = time.perf_counter()
+        try:
+            body_file = await self.read_body(receive)
+        except RequestAborted:
+            return
+        request, error_response = self.create_request(scope, body_file)
+        if request is None:
+            await self.send_fast_response(error_response, send)
+            return
+        request.resolver_match = match
+
+        response = self.process_request(request)
+        if response is None:
+            view = functools.partial(
+                match.func, *match.args, **match.kwargs
+            )
+            response = await convert_exception_to_response(view)(request)
+        response = self.process_response(request, response)
+
+        duration = time.perf_counter() - started
+        response['Server-Timing'] = f'app;dur={duration * 1000:.1f}'
+        metrics.observe(request, response, duration, 0, 0, match.url_name)
+        log_request(request, response, match.url_name, duration)
+        await self.send_fast_response(response, send, scope['method'])
+
+    def process_request(self, request):
+        for middleware in self.fast_middleware:
+            if hasattr(middleware, 'process_request'):
+                response = middleware.process_request(request)
+                if response is not None:
+                    return response
+        return None
+
+    def process_response(self, request, response):
+        for middleware in reversed(self.fast_middleware):
+            if hasattr(middleware, 'process_response'):
+                response = middleware.process_response(request, response)
+        return response
+
+    async def send_fast_response(self, response, send, method='GET'):
+        """Отправляет небольшой непотоковый ответ без request_finished:
+        быстрые маршруты не держат соединений с базой."""
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': [
+                (name.encode('ascii'), value.encode('latin1'))
+                for name, value in response.items()
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if method == 'HEAD' else response.content,
+        })
@@ -0,0 +1,22 @@
+"""Проверки настроек, которые выполняет manage.py check."""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии кэша ответов и справочников меняют все процессы: воркеры
+    gunicorn, run_worker и команды загрузки данных. С кэшем в памяти
+    процесса остальные процессы изменений не видят до истечения TTL."""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.DEBUG or backend != PROCESS_LOCAL_CACHE:
+        return []
+    return [Warning(
+        'Кэш в памяти процесса: изменения из других воркеров, run_worker '
+        'и команд загрузки не сбрасывают кэшированные ответы.',
+        hint='Задайте CACHE_BACKEND и CACHE_LOCATION общего кэша, '
+             'например memcached из docker-compose.',
+        id='api.W001',
+    )]
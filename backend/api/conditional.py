@@ -0,0 +1,122 @@
+"""Условные запросы (ETag / Last-Modified) для list и retrieve.
+
+Валидаторы считаются по лёгкому запросу values(): 304 отдаётся без
+загрузки связанных объектов и без сериализации.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+
+def conditional_response(request, etag, last_modified, build):
+    """Отдаёт 304, если клиент уже имеет актуальную версию, иначе build()."""
+    response = get_conditional_response(
+        request._request,
+        etag=etag,
+        last_modified=parse_http_date_safe(last_modified or ''),
+    )
+    if response is None:
+        response = build()
+
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = last_modified
+    return response
+
+
+class ConditionalResponseMixin:
+    """ETag/Last-Modified для ответов list и retrieve вьюсета.
+
+    validator_fields — поля values(), от которых зависит представление
+    объекта (помимо pk и updated_at), get_dependency_versions() — версии
+    общих данных, которых в строках нет. Last-Modified отдаётся только
+    анонимным пользователям: у остальных в ответе есть личные поля,
+    изменение которых не отражается в датах.
+    """
+
+    last_modified_fields = ('updated_at',)
+    validator_fields = ()
+
+    def get_validator_fields(self):
+        return ('pk', *self.last_modified_fields, *self.validator_fields)
+
+    def get_dependency_versions(self):
+        """Версии общих данных вне строк values(), входящих в ответ
+        (например, справочников): [(версия, время изменения или None)]."""
+        return []
+
+    def get_validators(self, rows, envelope=None):
+        versions = self.get_dependency_versions()
+        seed = json.dumps(
+            (
+                self.request.user.pk,
+                self.request.accepted_renderer.format,
+                envelope,
+                rows,
+                [version for version, _ in versions],
+            ),
+            cls=DjangoJSONEncoder,
+            sort_keys=True,
+        )
+        etag = f'"{hashlib.md5(seed.encode()).hexdigest()}"'
+
+        last_modified = None
+        changed_at = [changed_at for _, changed_at in versions]
+        if not self.request.user.is_authenticated and None not in changed_at:
+            timestamps = [
+                row[field].timestamp()
+                for row in rows
+                for field in self.last_modified_fields
+                if row[field] is not None
+            ]
+            if timestamps:
+                last_modified = http_date(max(timestamps + changed_at))
+        return etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*self.get_validator_fields())
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return conditional_response(
+                request, *self.get_validators(list(rows)),
+                lambda: super(ConditionalResponseMixin, self).list(
+                    request, *args, **kwargs
+                ),
+            )
+
+        envelope = self.get_paginated_response([]).data
+
+        def build():
+            objects = self.get_queryset().in_bulk(
+                [row['pk'] for row in page]
+            )
+            serializer = self.get_serializer(
+                [objects[row['pk']] for row in page], many=True
+            )
+            return self.get_paginated_response(serializer.data)
+
+        return conditional_response(
+            request, *self.get_validators(page, envelope), build
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        rows = list(self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        ).values(*self.get_validator_fields())[:1])
+
+        def build():
+            return super(ConditionalResponseMixin, self).retrieve(
+                request, *args, **kwargs
+            )
+
+        if not rows:
+            return build()
+        return conditional_response(
+            request, *self.get_validators(rows), build
+        )
@@ -0,0 +1,14 @@
+# Максимальное число SQL-запросов на GET-запрос к маршруту (имя из
+# роутера), с учётом проверки токена. Не зависит от размера страницы:
+# рост с числом объектов — признак N+1.
+QUERY_BUDGETS = {
+    'recipes-list': 7,
+    'recipes-detail': 6,
+    'recipes-download-shopping-cart': 2,
+    'users-list': 4,
+    'users-detail': 3,
+    'users-me': 3,
+    'users-subscriptions': 4,
+    'tags-list': 2,
+    'ingredients-list': 2,
+}
@@ -0,0 +1,10 @@
+"""Маршруты, на которые ASGI-приложение отвечает прямо в цикле событий."""
+from django.urls import path
+
+from .recipes.async_views import ingredient_list, short_link_redirect, tag_list
+
+urlpatterns = [
+    path('s/<slug:slug>/', short_link_redirect, name='short_link_handler'),
+    path('api/tags/', tag_list, name='tags-list'),
+    path('api/ingredients/', ingredient_list, name='ingredients-list'),
+]
@@ -0,0 +1,129 @@
+"""Учёт SQL-запросов на каждый HTTP-запрос.
+
+Количество запросов и время в базе данных отдаются клиенту в заголовке
+Server-Timing и пишутся в лог отдельными полями. Для маршрутов из
+QUERY_BUDGETS превышение бюджета GET-запросом логируется как предупреждение,
+а query_budget() превращает бюджет в проверку для тестов.
+"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+from api import metrics
+from api.constants import QUERY_BUDGETS
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper: считает запросы и их суммарное время.
+
+    Работает без DEBUG и не хранит текст запросов, если не передан
+    record=True.
+    """
+
+    def __init__(self, record=False):
+        self.count = 0
+        self.duration = 0.0
+        self.queries = [] if record else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            if self.queries is not None:
+                self.queries.append(sql)
+
+    @contextmanager
+    def capture(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.url_name if match is not None else None
+
+
+class QueryInstrumentationMiddleware:
+    """Server-Timing, метрики и поля лога со временем SQL-запросов.
+
+    Для потоковых ответов учитываются только запросы до начала отдачи
+    тела: заголовки уходят раньше, чем оно будет сформировано.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with QueryCounter().capture() as counter:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={counter.duration * 1000:.1f};'
+            f'desc="{counter.count} queries"',
+            f'app;dur={total * 1000:.1f}',
+        ))
+
+        route = get_route(request)
+        metrics.observe(
+            request, response, total, counter.duration, counter.count, route
+        )
+        log_request(
+            request, response, route, total, counter.duration, counter.count
+        )
+        return response
+
+
+def log_request(request, response, route, duration, db_duration=0,
+                db_queries=0):
+    """Пишет запрос в лог; превышение бюджета GET-запросом — warning."""
+    fields = {
+        'route': route,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'db_queries': db_queries,
+        'db_time_ms': round(db_duration * 1000, 1),
+        'duration_ms': round(duration * 1000, 1),
+    }
+    budget = QUERY_BUDGETS.get(route)
+    if request.method == 'GET' and budget is not None and (
+        db_queries > budget
+    ):
+        logger.warning(
+            'Превышен бюджет запросов %s: %s > %s',
+            route, db_queries, budget, extra=fields,
+        )
+    else:
+        logger.info('%s %s', request.method, request.path, extra=fields)
+
+
+@contextmanager
+def query_budget(route, budget=None):
+    """Проверка для тестов: блок укладывается в бюджет запросов маршрута.
+
+    Потоковые ответы нужно прочитать внутри блока. При превышении
+    AssertionError перечисляет выполненные запросы.
+    """
+    budget = QUERY_BUDGETS[route] if budget is None else budget
+    with QueryCounter(record=True).capture() as counter:
+        yield counter
+    if counter.count > budget:
+        queries = '\n'.join(
+            f'{number}. {sql}'
+            for number, sql in enumerate(counter.queries, start=1)
+        )
+        raise AssertionError(
+            f'{route}: {counter.count} SQL-запросов при бюджете {budget}\n'
+            f'{queries}'
+        )
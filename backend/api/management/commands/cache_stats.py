@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.recipes.cache import get_stats
+
+
+class Command(BaseCommand):
+    help = "Статистика кэша ответов для рецептов"
+
+    def handle(self, *args, **options) -> str:
+        stats = get_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        return (
+            f"hits: {stats['hits']}, misses: {stats['misses']}, "
+            f"hit ratio: {ratio:.1%}"
+        )
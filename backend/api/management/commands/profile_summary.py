@@ -0,0 +1,58 @@
+import io
+import json
+import pstats
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.profiling import META_SUFFIX, PROFILE_SUFFIX
+
+
+class Command(BaseCommand):
+    help = "Сводка по сохранённым профилям запросов"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=settings.PROFILING_DIR)
+        parser.add_argument('--view', help='Только профили этого маршрута.')
+        parser.add_argument('--limit', type=int, default=25)
+        parser.add_argument(
+            '--sort',
+            default='cumulative',
+            choices=('cumulative', 'tottime', 'ncalls'),
+        )
+
+    def handle(self, *args, **options) -> str:
+        profiles = []
+        durations = defaultdict(list)
+        for path in sorted(Path(options['dir']).glob(f'*{PROFILE_SUFFIX}')):
+            try:
+                meta = json.loads(path.with_suffix(META_SUFFIX).read_text())
+            except (OSError, ValueError):
+                meta = {'view': 'unknown', 'duration_ms': 0}
+            if options['view'] and meta['view'] != options['view']:
+                continue
+            profiles.append(str(path))
+            durations[meta['view']].append(meta['duration_ms'])
+
+        if not profiles:
+            raise CommandError('Профили не найдены')
+
+        for view, values in sorted(
+            durations.items(), key=lambda item: -sum(item[1])
+        ):
+            self.stdout.write(
+                f'{view}: {len(values)} profiles, '
+                f'avg {sum(values) / len(values):.1f} ms, '
+                f'max {max(values):.1f} ms'
+            )
+        self.stdout.write('')
+
+        buffer = io.StringIO()
+        stats = pstats.Stats(*profiles, stream=buffer)
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(
+            options['limit']
+        )
+        self.stdout.write(buffer.getvalue())
+        return f"Профилей: {len(profiles)}"
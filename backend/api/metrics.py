@@ -0,0 +1,95 @@
+"""Метрики запросов в формате Prometheus.
+
+Под gunicorn каждый воркер — отдельный процесс, поэтому при заданной
+переменной окружения PROMETHEUS_MULTIPROC_DIR значения пишутся в файлы
+этого каталога и суммируются при выдаче. Перцентили (p50/p95/p99)
+считаются на стороне Prometheus по гистограммам:
+histogram_quantile(0.95, rate(http_request_duration_seconds_bucket[5m])).
+"""
+import os
+
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+RESPONSE_SIZE_BUCKETS = tuple(256 * 4 ** power for power in range(9))
+
+REQUESTS = Counter(
+    'http_requests_total',
+    'Количество запросов по маршруту, методу и статусу.',
+    ('view', 'method', 'status'),
+)
+DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Полное время обработки запроса.',
+    ('view', 'method'),
+)
+DB_DURATION = Histogram(
+    'http_request_db_seconds',
+    'Время SQL-запросов внутри запроса.',
+    ('view', 'method'),
+)
+APP_DURATION = Histogram(
+    'http_request_app_seconds',
+    'Время вне базы данных: сериализация, фильтры, рендеринг.',
+    ('view', 'method'),
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Количество SQL-запросов на запрос.',
+    ('view', 'method'),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'Размер тела ответа (кроме потоковых).',
+    ('view', 'method'),
+    buckets=RESPONSE_SIZE_BUCKETS,
+)
+
+
+def observe(request, response, duration, db_duration, db_queries, view):
+    """Учитывает завершённый запрос во всех метриках."""
+    view = view or 'unresolved'
+    method = request.method
+    REQUESTS.labels(view, method, response.status_code).inc()
+    DURATION.labels(view, method).observe(duration)
+    DB_DURATION.labels(view, method).observe(db_duration)
+    APP_DURATION.labels(view, method).observe(
+        max(duration - db_duration, 0)
+    )
+    DB_QUERIES.labels(view, method).observe(db_queries)
+    if not response.streaming:
+        RESPONSE_SIZE.labels(view, method).observe(len(response.content))
+
+
+def get_registry():
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+class IsStaffOrInternal(permissions.BasePermission):
+    """Доступ для администраторов и с адресов METRICS_ALLOWED_IPS."""
+
+    def has_permission(self, request, view):
+        return (request.user.is_staff
+                or request.META.get('REMOTE_ADDR')
+                in settings.METRICS_ALLOWED_IPS)
+
+
+class MetricsView(APIView):
+    """Метрики всех воркеров в текстовом формате Prometheus."""
+
+    permission_classes = (IsStaffOrInternal,)
+
+    def get(self, request):
+        return HttpResponse(
+            generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST
+        )
@@ -0,0 +1,96 @@
+"""Выборочное профилирование запросов через cProfile.
+
+Включается настройкой PROFILING_ENABLED; выключенное middleware
+исключается Django из цепочки и ничего не стоит. Профилируется доля
+запросов PROFILING_SAMPLE_RATE, а при заданном PROFILING_SLOW_MS —
+все запросы, но сохраняются только медленные. Рядом с каждым файлом
+pstats пишется JSON с маршрутом и параметрами запроса.
+"""
+import cProfile
+import json
+import logging
+import os
+import random
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = '.prof'
+META_SUFFIX = '.json'
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.url_name or match.view_name
+
+
+def rotate(directory, keep):
+    """Удаляет самые старые дампы сверх keep."""
+    profiles = sorted(
+        directory.glob(f'*{PROFILE_SUFFIX}'), key=lambda path: path.name
+    )
+    for path in profiles[:max(len(profiles) - keep, 0)]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(META_SUFFIX).unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.directory = Path(settings.PROFILING_DIR)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_ms = settings.PROFILING_SLOW_MS
+
+    def __call__(self, request):
+        sampled = random.random() < self.sample_rate
+        if not sampled and self.slow_ms is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Профилировщик уже запущен в другом потоке этого процесса.
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        if sampled or duration_ms >= self.slow_ms:
+            self.save(profiler, request, response, duration_ms, sampled)
+        return response
+
+    def save(self, profiler, request, response, duration_ms, sampled):
+        view = get_view_name(request)
+        name = (
+            f'{time.time():.6f}_{os.getpid()}_{view}_{duration_ms:.0f}ms'
+        ).replace(os.sep, '_')
+        path = self.directory / f'{name}{PROFILE_SUFFIX}'
+        try:
+            profiler.dump_stats(path)
+            path.with_suffix(META_SUFFIX).write_text(json.dumps({
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'query': request.GET.dict(),
+                'status': response.status_code,
+                'duration_ms': round(duration_ms, 1),
+                'reason': 'sample' if sampled else 'slow',
+            }, ensure_ascii=False))
+            rotate(self.directory, settings.PROFILING_MAX_FILES)
+        except OSError:
+            logger.exception('Не удалось сохранить профиль %s', path)
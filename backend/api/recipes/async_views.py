@@ -0,0 +1,69 @@
+"""Асинхронные представления для горячих маршрутов чтения.
+
+Отвечают из кэшей процесса. К общему кэшу и базе обращаются только при
+сверке версий, и то в пуле потоков, не блокируя цикл событий.
+"""
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseRedirect
+from rest_framework.renderers import JSONRenderer
+
+from .serializers import IngredientSerializer
+from .tags import tag_list_data
+from .views import get_short_link_target
+from api.recipes.constants import INGREDIENT_SEARCH_LIMIT
+from recipes import short_links
+from recipes.ingredient_index import ingredient_index
+
+
+def call_with_fresh_connections(func):
+    close_old_connections()
+    try:
+        return func()
+    finally:
+        close_old_connections()
+
+
+async def in_thread(func):
+    return await sync_to_async(
+        call_with_fresh_connections, thread_sensitive=False
+    )(func)
+
+
+def json_response(data):
+    renderer = JSONRenderer()
+    return HttpResponse(
+        renderer.render(data), content_type=renderer.media_type
+    )
+
+
+async def tag_list(request):
+    data = tag_list_data.current()
+    if data is None:
+        data = await in_thread(tag_list_data.get)
+    return json_response(data)
+
+
+async def ingredient_list(request):
+    snapshot = ingredient_index.current()
+    if snapshot is None:
+        snapshot = await in_thread(ingredient_index.get_snapshot)
+
+    name = (request.GET.get('name') or '').strip()
+    if name:
+        ingredients = snapshot.search(name, INGREDIENT_SEARCH_LIMIT)
+    else:
+        ingredients = snapshot.rows
+    return json_response(IngredientSerializer(ingredients, many=True).data)
+
+
+async def short_link_redirect(request, slug):
+    recipe_pk = short_links.resolved.get(slug)
+    if recipe_pk is short_links.MISSING:
+        recipe_pk = await in_thread(lambda: short_links.resolve(slug))
+    target = get_short_link_target(request, recipe_pk)
+
+    short_links.hits.add(slug)
+    if short_links.hits.is_due():
+        await in_thread(short_links.hits.flush)
+    return HttpResponseRedirect(target)
@@ -0,0 +1,133 @@
+"""Пакетное создание рецептов.
+
+Теги и ингредиенты проверяются по множествам id из кэшей процесса, без
+запросов к базе на каждый рецепт. Корректные рецепты вставляются через
+bulk_create пачками, каждая в своей транзакции; ошибки возвращаются для
+каждого элемента и не прерывают загрузку остальных.
+
+bulk_create не отправляет сигналы, поэтому счётчик рецептов автора, кэш
+списка рецептов и задачи на варианты изображений обновляются здесь.
+Изображения записываются в хранилище при вставке, до фиксации
+транзакции; если пачка откатывается, её файлы удаляются.
+"""
+import logging
+
+from django.db import DatabaseError, connection, transaction
+
+from .serializers import RecipeBulkItemSerializer
+from api.recipes import cache
+from jobs.queue import enqueue
+from recipes import counters
+from recipes.loaders import batched
+from recipes.models import Recipe, RecipeIngredient, User
+from recipes.renditions import generate_objects_renditions
+
+logger = logging.getLogger(__name__)
+
+SAVE_ERROR = 'Не удалось сохранить рецепт.'
+
+
+def insert_recipes(recipes):
+    Recipe.objects.bulk_create(recipes)
+    if connection.features.can_return_rows_from_bulk_insert:
+        return
+    # SQLite в Django 3.2 не возвращает id из bulk_create. После первой
+    # вставки транзакция держит блокировку записи, а AUTOINCREMENT выдаёт
+    # id по порядку строк, поэтому последние len(recipes) id принадлежат
+    # этой пачке. Названия сверяются, чтобы нарушение этого допущения
+    # откатило пачку, а не связало теги и ингредиенты с чужими рецептами.
+    rows = list(Recipe.objects.order_by('-pk').values_list('pk', 'name')[
+        :len(recipes)
+    ])[::-1]
+    if [name for _, name in rows] != [recipe.name for recipe in recipes]:
+        raise DatabaseError('Не удалось определить id вставленных рецептов.')
+    for recipe, (pk, _) in zip(recipes, rows):
+        recipe.pk = pk
+
+
+def delete_images(recipes):
+    """Удаляет файлы изображений, уже записанные в хранилище."""
+    for recipe in recipes:
+        # До записи в хранилище у файла временное имя из поля, его
+        # удалять нельзя.
+        if recipe.image and recipe.image._committed:
+            recipe.image.storage.delete(recipe.image.name)
+
+
+def save_batch(author, batch):
+    """Сохраняет пачку проверенных рецептов: [(recipe, tags, ingredients)].
+
+    При ошибке базы данных пачка откатывается вместе с файлами
+    изображений.
+    """
+    recipes = [recipe for recipe, _, _ in batch]
+    try:
+        with transaction.atomic():
+            insert_batch(author, batch)
+    except DatabaseError:
+        delete_images(recipes)
+        raise
+
+
+def insert_batch(author, batch):
+    recipes = [recipe for recipe, _, _ in batch]
+    insert_recipes(recipes)
+
+    RecipeIngredient.objects.bulk_create(
+        RecipeIngredient(
+            recipe=recipe,
+            ingredient_id=ingredient['id'],
+            amount=ingredient['amount'],
+        )
+        for recipe, _, ingredients in batch
+        for ingredient in ingredients
+    )
+    Recipe.tags.through.objects.bulk_create(
+        Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag_id)
+        for recipe, tags, _ in batch
+        for tag_id in tags
+    )
+
+    counters.increment(User, author.pk, 'recipes_count', len(recipes))
+    cache.invalidate(cache.LIST)
+    enqueue(
+        generate_objects_renditions,
+        'recipes.Recipe',
+        [recipe.pk for recipe in recipes],
+        'image',
+    )
+
+
+def bulk_create_recipes(items, author, tag_ids, ingredient_ids, batch_size):
+    """Создаёт рецепты items от имени author.
+
+    Возвращает по результату на каждый элемент, в исходном порядке:
+    {'index': i, 'id': id} или {'index': i, 'errors': ошибки}.
+    """
+    context = {'tag_ids': tag_ids, 'ingredient_ids': ingredient_ids}
+    results = []
+    valid = []
+    for index, item in enumerate(items):
+        serializer = RecipeBulkItemSerializer(data=item, context=context)
+        if not serializer.is_valid():
+            results.append({'index': index, 'errors': serializer.errors})
+            continue
+        data = dict(serializer.validated_data)
+        tags = data.pop('tags')
+        ingredients = data.pop('ingredients')
+        result = {'index': index}
+        results.append(result)
+        recipe = Recipe(author=author, **data)
+        valid.append((result, recipe, tags, ingredients))
+
+    for chunk in batched(valid, batch_size):
+        try:
+            save_batch(author, [entry[1:] for entry in chunk])
+        except DatabaseError:
+            logger.exception('Не удалось сохранить пачку рецептов')
+            for result, *_ in chunk:
+                result['errors'] = {'non_field_errors': [SAVE_ERROR]}
+            continue
+        for result, recipe, *_ in chunk:
+            result['id'] = recipe.pk
+    return results
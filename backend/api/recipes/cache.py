@@ -0,0 +1,185 @@
+"""Кэш ответов на анонимные запросы к рецептам.
+
+Каждая запись хранит версии зависимостей, на которых она построена
+(список рецептов, конкретный рецепт, его автор, теги, ингредиенты).
+Изменение данных меняет версию зависимости, и при следующем чтении
+запись считается устаревшей — удалять сами записи не требуется, поэтому
+подходит любой бэкенд кэша Django.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.conditional import conditional_response
+
+CACHE_PREFIX = 'recipes_cache'
+STATS = ('hits', 'misses')
+
+LIST = 'list'
+TAGS = 'tags'
+INGREDIENTS = 'ingredients'
+
+
+def recipe_dependency(pk):
+    return f'recipe:{pk}'
+
+
+def author_dependency(pk):
+    return f'author:{pk}'
+
+
+def version_key(dependency):
+    return f'{CACHE_PREFIX}:version:{dependency}'
+
+
+def new_version():
+    """Версия зависимости: время изменения и случайный суффикс."""
+    return f'{time.time():.6f}-{uuid.uuid4().hex}'
+
+
+def version_time(version):
+    """Время изменения из версии или None, если его нельзя узнать."""
+    try:
+        return float(version.split('-', 1)[0])
+    except (AttributeError, ValueError):
+        return None
+
+
+def get_versions(dependencies):
+    """Текущие версии зависимостей; отсутствующие создаются заново."""
+    keys = {version_key(dependency): dependency for dependency in dependencies}
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        for key in missing:
+            cache.add(key, new_version(), None)
+        found.update(cache.get_many(missing))
+    return {keys[key]: version for key, version in found.items()}
+
+
+def invalidate(*dependencies):
+    """Меняет версии зависимостей после фиксации транзакции."""
+    transaction.on_commit(lambda: cache.set_many(
+        {version_key(dependency): new_version()
+         for dependency in dependencies},
+        None,
+    ))
+
+
+def record(stat):
+    key = f'{CACHE_PREFIX}:stats:{stat}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_stats():
+    keys = {f'{CACHE_PREFIX}:stats:{stat}': stat for stat in STATS}
+    values = cache.get_many(keys)
+    return {stat: values.get(key, 0) for key, stat in keys.items()}
+
+
+def build_key(request, scope):
+    """Ключ записи по области и нормализованным параметрам запроса."""
+    params = urlencode(sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    ))
+    raw_key = '|'.join((
+        request.scheme,
+        request.get_host(),
+        request.accepted_renderer.format,
+        params,
+    ))
+    digest = hashlib.md5(raw_key.encode()).hexdigest()
+    return f'{CACHE_PREFIX}:{scope}:{digest}'
+
+
+def cached_response(request, scope, dependencies, build,
+                    get_dependencies=None):
+    """Возвращает ответ из кэша или строит его через build().
+
+    Кэшируются только анонимные запросы: у авторизованных в ответе есть
+    поля, зависящие от пользователя. get_dependencies(data) позволяет
+    добавить зависимости, известные только после построения ответа.
+    """
+    if request.user.is_authenticated:
+        return build()
+
+    key = build_key(request, scope)
+    entry = cache.get(key)
+    if entry is not None:
+        versions, data, etag, last_modified = entry
+        if get_versions(versions) == versions:
+            record('hits')
+            response = conditional_response(
+                request, etag, last_modified, lambda: Response(data)
+            )
+            response['X-Cache'] = 'HIT'
+            return response
+
+    record('misses')
+    versions = get_versions(dependencies)
+    response = build()
+    if response.status_code == status.HTTP_200_OK:
+        if get_dependencies is not None:
+            versions.update(get_versions(get_dependencies(response.data)))
+        cache.set(
+            key,
+            (
+                versions,
+                response.data,
+                response.get('ETag'),
+                response.get('Last-Modified'),
+            ),
+            settings.RECIPES_CACHE_TIMEOUT,
+        )
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class VersionedValue:
+    """Значение в памяти процесса, построенное по версиям зависимостей.
+
+    get() сверяет версии с общим кэшем и при их смене перестраивает
+    значение через build(). current() отдаёт значение без обращения к
+    кэшу и базе, пока с последней сверки прошло меньше check_interval
+    секунд, и подходит для асинхронного кода.
+    """
+
+    def __init__(self, dependencies, build, check_interval):
+        self.dependencies = dependencies
+        self.build = build
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def current(self):
+        entry = self._entry
+        if entry is not None and (
+            time.monotonic() - entry[2] < self.check_interval
+        ):
+            return entry[1]
+        return None
+
+    def get(self):
+        versions = get_versions(self.dependencies)
+        entry = self._entry
+        if entry is None or entry[0] != versions:
+            with self._lock:
+                entry = self._entry
+                if entry is None or entry[0] != versions:
+                    entry = (versions, self.build())
+        self._entry = (entry[0], entry[1], time.monotonic())
+        return entry[1]
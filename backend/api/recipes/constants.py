@@ -1 +1,14 @@
-SCALE_OF_NOTATION = 16
+INGREDIENT_SEARCH_LIMIT = 50
+TAGS_CHECK_INTERVAL = 1  # seconds
+
+BULK_CREATE_MAX_ITEMS = 500
+BULK_CREATE_BATCH_SIZE = 100
+BATCH_MAX_RECIPES = 100
+
+SHOPPING_LIST_TITLE = 'Список необходмых ингредиентов:'
+SHOPPING_LIST_CHUNK_SIZE = 2000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+PDF_FONT_NAME = 'DejaVuSans'
+PDF_FONT_SIZE = 12
+PDF_MARGIN = 50
@@ -1,6 +1,8 @@
-from django_filters import CharFilter, FilterSet, ModelMultipleChoiceFilter
+from django_filters import CharFilter, FilterSet, MultipleChoiceFilter
 
-from recipes.models import Ingredient, Recipe, Tag
+from api.recipes.tags import get_tag_choices
+from recipes.models import Ingredient, Recipe
+from recipes.search import search_recipes
 
 
 class IngredientFilter(FilterSet):
@@ -22,13 +24,14 @@ class IngredientFilter(FilterSet):
 class RecipeFilter(FilterSet):
     """Фильтр рецептов."""
 
-    tags = ModelMultipleChoiceFilter(
+    # Допустимые slug берутся из списка тегов в памяти, без запроса.
+    tags = MultipleChoiceFilter(
         field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all()
+        choices=get_tag_choices,
     )
     is_favorited = CharFilter(method='get_favorite')
     is_in_shopping_cart = CharFilter(method='get_is_in_shopping_cart')
+    search = CharFilter(method='get_search')
 
     def get_favorite(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
@@ -42,6 +45,12 @@ class RecipeFilter(FilterSet):
                 shopping_carts__user=self.request.user)
         return queryset
 
+    def get_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и тексту с ранжированием."""
+        return search_recipes(queryset, value)
+
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = (
+            'tags', 'author', 'is_favorited', 'is_in_shopping_cart', 'search',
+        )
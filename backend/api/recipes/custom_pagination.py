@@ -1,5 +1,43 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from recipes.search import is_ranked
 
 
 class CustomPagination(PageNumberPagination):
     page_size_query_param = 'limit'
+
+
+class RecipeCursorPagination(CursorPagination):
+    """Курсорная пагинация рецептов без COUNT(*) и OFFSET."""
+
+    ordering = ('-pub_date', 'id')
+    page_size_query_param = 'limit'
+
+
+class RecipePagination(CustomPagination):
+    """Постраничная пагинация с курсорным режимом по запросу (?cursor=).
+
+    Курсор задаёт свой порядок (по дате), поэтому результаты поиска,
+    упорядоченные по релевантности, всегда разбиваются на страницы.
+    """
+
+    cursor_query_param = RecipeCursorPagination.cursor_query_param
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param in request.query_params
+            and not is_ranked(queryset)
+        ):
+            self.cursor_paginator = RecipeCursorPagination()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
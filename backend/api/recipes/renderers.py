@@ -0,0 +1,126 @@
+import csv
+from abc import ABCMeta, abstractmethod
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+from reportlab.pdfgen import canvas
+from rest_framework import renderers
+
+from api.recipes.constants import (PDF_FONT_NAME, PDF_FONT_SIZE, PDF_MARGIN,
+                                   SHOPPING_LIST_TITLE, STREAM_CHUNK_SIZE)
+
+
+class ShoppingListRenderer(renderers.BaseRenderer, metaclass=ABCMeta):
+    """Базовый рендерер списка покупок.
+
+    Сам список отдаётся потоком через stream(), а render() используется
+    DRF только для ответов с ошибками. prepare() вызывается до отправки
+    заголовков: ошибки в нём дают обычный ответ 500, а не обрезанный
+    файл.
+    """
+
+    charset = 'utf-8'
+    headers = ('Ингредиент', 'Количество', 'Единица измерения')
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode(self.charset or 'utf-8')
+
+    def prepare(self):
+        """Проверяет, что файл можно построить."""
+
+    @abstractmethod
+    def stream(self, rows):
+        """Возвращает итератор по частям файла для строк (имя, ед., сумма)."""
+
+
+class TextShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        yield f'{SHOPPING_LIST_TITLE}\n\n'
+        for name, unit, amount in rows:
+            yield f'{name}: {amount} {unit}\n'
+
+
+class Echo:
+    """Псевдобуфер, который возвращает записанное вместо хранения."""
+
+    def write(self, value):
+        return value
+
+
+class CSVShoppingListRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.headers)
+        for name, unit, amount in rows:
+            yield writer.writerow((name, amount, unit))
+
+
+class PDFShoppingListRenderer(ShoppingListRenderer):
+    """PDF со списком покупок.
+
+    Формат PDF требует таблицу ссылок в конце файла, поэтому документ
+    сначала собирается во временный файл (на диске для больших списков),
+    а затем отдаётся частями.
+    """
+
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def prepare(self):
+        if PDF_FONT_NAME in pdfmetrics.getRegisteredFontNames():
+            return
+        try:
+            font = TTFont(PDF_FONT_NAME, settings.SHOPPING_LIST_PDF_FONT)
+        except (OSError, TTFError) as error:
+            raise ImproperlyConfigured(
+                f'Не удалось загрузить шрифт SHOPPING_LIST_PDF_FONT '
+                f'({settings.SHOPPING_LIST_PDF_FONT}): {error}'
+            ) from error
+        pdfmetrics.registerFont(font)
+
+    def stream(self, rows):
+        with SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        ) as buffer:
+            document = canvas.Canvas(buffer, pagesize=A4)
+            width, height = A4
+            leading = PDF_FONT_SIZE * 1.5
+            document.setTitle(SHOPPING_LIST_TITLE)
+            document.setFont(PDF_FONT_NAME, PDF_FONT_SIZE + 4)
+            y = height - PDF_MARGIN
+            document.drawString(PDF_MARGIN, y, SHOPPING_LIST_TITLE)
+            y -= leading * 2
+            document.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+            for name, unit, amount in rows:
+                if y < PDF_MARGIN:
+                    document.showPage()
+                    document.setFont(PDF_FONT_NAME, PDF_FONT_SIZE)
+                    y = height - PDF_MARGIN
+                document.drawString(PDF_MARGIN, y, f'{name}')
+                document.drawRightString(
+                    width - PDF_MARGIN, y, f'{amount} {unit}'
+                )
+                y -= leading
+            document.save()
+
+            buffer.seek(0)
+            while True:
+                chunk = buffer.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
@@ -2,15 +2,19 @@ from collections import OrderedDict
 
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
 
-from api.users.fields import Base64ImageField
+from api.recipes.constants import BATCH_MAX_RECIPES
+from api.users.fields import Base64ImageField, ImageRenditionsField
 from api.users.serializers import UserSerializer
+from api.users.subscriptions import get_recipes_limit
+from recipes import shopping_list
 from recipes.constants import (MAX_AMOUNT, MAX_COOKING_TIME, MIN_AMOUNT,
                                MIN_COOKING_TIME)
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
-from users.models import Subscription
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
 
 User = get_user_model()
 
@@ -18,9 +22,11 @@ User = get_user_model()
 class ShortRecipeSerializer(serializers.ModelSerializer):
     """Короткие рецепты (только id, name, image, time)."""
 
+    image_renditions = ImageRenditionsField('image')
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_renditions', 'cooking_time')
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -53,9 +59,9 @@ class RecipeIngredientSerialiser(serializers.ModelSerializer):
 
 
 class RecipeIngredientCreateSerialiser(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all()
-    )
+    # Существование ингредиентов проверяет RecipeCreateSerializer
+    # одним запросом на весь список.
+    id = serializers.IntegerField()
 
     amount = serializers.IntegerField(
         validators=[
@@ -77,6 +83,7 @@ class RecipeSerializer(serializers.ModelSerializer):
     ingredients = RecipeIngredientSerialiser(
         read_only=True, many=True, source='ingredient_list')
     image = Base64ImageField()
+    image_renditions = ImageRenditionsField('image')
     is_favorited = serializers.SerializerMethodField(default=False)
     is_in_shopping_cart = serializers.SerializerMethodField(default=False)
 
@@ -84,19 +91,29 @@ class RecipeSerializer(serializers.ModelSerializer):
         model = Recipe
         fields = (
             'id', 'tags', 'author', 'ingredients', 'name', 'image',
-            'text', 'cooking_time', 'is_favorited', 'is_in_shopping_cart',
+            'image_renditions', 'text', 'cooking_time', 'is_favorited',
+            'is_in_shopping_cart', 'favorites_count',
         )
 
+    def to_representation(self, instance):
+        if hasattr(instance, 'is_author_subscribed'):
+            instance.author.is_subscribed = instance.is_author_subscribed
+        return super().to_representation(instance)
+
     def get_is_favorited(self, obj):
         request = self.context['request']
         if not request or not request.user.is_authenticated:
             return False
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         return request.user.favorite_recipes.filter(recipe=obj).exists()
 
     def get_is_in_shopping_cart(self, obj):
         request = self.context['request']
         if not request or not request.user.is_authenticated:
             return False
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         return request.user.shopping_carts.filter(recipe=obj).exists()
 
 
@@ -122,11 +139,15 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             'text', 'cooking_time',
         )
 
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
         recipe = Recipe.objects.create(**validated_data)
         self.add_tags_and_ingredients(recipe, tags, ingredients)
+        # Новый рецепт ещё не может быть в избранном или корзине.
+        recipe.is_favorited = False
+        recipe.is_in_shopping_cart = False
         return recipe
 
     def validate(self, attrs):
@@ -149,32 +170,88 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
 
         return attrs
 
-    def update(self, instance: Recipe, validated_data):
-        RecipeIngredient.objects.filter(recipe=instance).delete()
-        instance.tags.clear()
+    def get_existing_ingredients(self, pks):
+        return set(Ingredient.objects.filter(
+            pk__in=pks
+        ).values_list('pk', flat=True))
+
+    def validate_ingredients(self, ingredients):
+        """Проверяет существование всех ингредиентов одним запросом."""
+        existing = self.get_existing_ingredients(
+            {ingredient['id'] for ingredient in ingredients}
+        )
+        if all(ingredient['id'] in existing for ingredient in ingredients):
+            return ingredients
 
+        message = serializers.PrimaryKeyRelatedField.default_error_messages[
+            'does_not_exist'
+        ]
+        raise serializers.ValidationError([
+            {} if ingredient['id'] in existing
+            else {'id': [ErrorDetail(
+                message.format(pk_value=ingredient['id']),
+                code='does_not_exist',
+            )]}
+            for ingredient in ingredients
+        ])
+
+    @transaction.atomic
+    def update(self, instance: Recipe, validated_data):
         tags = validated_data.pop('tags')
         ingredients = validated_data.pop('ingredients')
-        self.add_tags_and_ingredients(instance, tags, ingredients)
+
+        shopping_list.remove_recipe(instance)
+        instance.tags.set(tags)
+        self.update_ingredients(instance, ingredients)
+        shopping_list.add_recipe(instance)
 
         return super().update(instance, validated_data)
 
+    def update_ingredients(self, recipe, ingredients):
+        """Применяет только разницу между текущим и новым составом."""
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients
+        }
+        current = {
+            item.ingredient_id: item for item in recipe.ingredient_list.all()
+        }
+
+        removed = [
+            item.pk for pk, item in current.items() if pk not in amounts
+        ]
+        if removed:
+            RecipeIngredient.objects.filter(pk__in=removed).delete()
+
+        changed = []
+        for pk, item in current.items():
+            if pk in amounts and item.amount != amounts[pk]:
+                item.amount = amounts[pk]
+                changed.append(item)
+        RecipeIngredient.objects.bulk_update(changed, ('amount',))
+
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(recipe=recipe, ingredient_id=pk, amount=amount)
+            for pk, amount in amounts.items() if pk not in current
+        )
+
     def add_tags_and_ingredients(self, recipe, tags, ingredients):
-        for tag_id in tags:
-            recipe.tags.add(tag_id)
-
-        ingredient_list = []
-        for ingredient in ingredients:
-            pk = ingredient.get('id')
-            amount = ingredient.get('amount')
-            ingredient_list.append(
-                RecipeIngredient(recipe=recipe, ingredient=pk, amount=amount)
+        recipe.tags.add(*tags)
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=recipe,
+                ingredient_id=ingredient['id'],
+                amount=ingredient['amount'],
             )
-
-        RecipeIngredient.objects.bulk_create(ingredient_list)
+            for ingredient in ingredients
+        )
         return recipe
 
     def to_representation(self, instance):
+        # После update DRF сбрасывает предзагруженные связи рецепта.
+        prefetch_related_objects(
+            [instance], 'tags', 'ingredient_list__ingredient'
+        )
         request = self.context.get('request')
         return RecipeSerializer(
             instance=instance,
@@ -182,63 +259,58 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
         ).data
 
 
+class RecipeBulkItemSerializer(RecipeCreateSerializer):
+    """Рецепт пакетной загрузки.
+
+    Теги и ингредиенты сверяются с множествами id из контекста
+    (tag_ids, ingredient_ids), без запросов к базе.
+    """
+
+    tags = serializers.ListField(
+        child=serializers.IntegerField(), required=True
+    )
+
+    def get_existing_ingredients(self, pks):
+        return pks & self.context['ingredient_ids']
+
+    def validate_tags(self, tags):
+        for pk in tags:
+            if pk not in self.context['tag_ids']:
+                raise serializers.ValidationError(
+                    serializers.PrimaryKeyRelatedField.default_error_messages[
+                        'does_not_exist'
+                    ].format(pk_value=pk),
+                    code='does_not_exist',
+                )
+        return tags
+
+
 class SubscriptionSerializer(UserSerializer):
     """Сериалайзер для получения результата подписки."""
 
     recipes = serializers.SerializerMethodField(read_only=True)
-    recipes_count = serializers.ReadOnlyField(source='recipes.count')
+    recipes_count = serializers.ReadOnlyField()
 
     class Meta(UserSerializer.Meta):
         fields = (*UserSerializer.Meta.fields, 'recipes', 'recipes_count')
 
     def get_recipes(self, obj):
+        if hasattr(obj, 'latest_recipes'):
+            return ShortRecipeSerializer(obj.latest_recipes, many=True).data
+
         request = self.context.get('request')
         recipes = obj.recipes.all()
-        recipes_limit = request.query_params.get('recipes_limit')
+        recipes_limit = get_recipes_limit(request)
         if recipes_limit:
-            recipes = recipes[:int(recipes_limit)]
+            recipes = recipes[:recipes_limit]
         return ShortRecipeSerializer(recipes, many=True).data
 
 
-class SubscriptionCreateSerializer(serializers.ModelSerializer):
-    """Сериалайзер для создания подписки."""
-
-    class Meta:
-        model = Subscription
-        fields = ('user', 'author')
-
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        return SubscriptionSerializer(
-            instance.author,
-            context={'request': request}
-        ).data
-
-
-class FavoriteCreateSerializer(serializers.ModelSerializer):
-    """Сериалайзер для добавление в избранное."""
-
-    user = serializers.PrimaryKeyRelatedField(read_only=True)
-    recipe = serializers.PrimaryKeyRelatedField(queryset=Recipe.objects.all())
+class RecipeIdsSerializer(serializers.Serializer):
+    """Список id рецептов для пакетных операций."""
 
-    class Meta:
-        model = Favorite
-        fields = ('user', 'recipe')
-
-    def create(self, validated_data):
-        validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
-
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        return ShortRecipeSerializer(
-            instance.recipe,
-            context={'request': request}
-        ).data
-
-
-class ShoppingCartCreateSerializer(FavoriteCreateSerializer):
-    """Сериалайзер для добавление в список покупок."""
-
-    class Meta(FavoriteCreateSerializer.Meta):
-        model = ShoppingCart
+    recipes = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_RECIPES,
+    )
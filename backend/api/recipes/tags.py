@@ -0,0 +1,19 @@
+"""Список тегов в памяти процесса.
+
+Отдаётся в /api/tags/ и служит справочником для фильтра рецептов по
+тегам и проверки тегов при пакетном создании, без запросов к базе.
+"""
+from .serializers import TagSerializer
+from api.recipes import cache
+from api.recipes.constants import TAGS_CHECK_INTERVAL
+from recipes.models import Tag
+
+tag_list_data = cache.VersionedValue(
+    (cache.TAGS,),
+    lambda: list(TagSerializer(Tag.objects.all(), many=True).data),
+    TAGS_CHECK_INTERVAL,
+)
+
+
+def get_tag_choices():
+    return [(tag['slug'], tag['name']) for tag in tag_list_data.get()]
@@ -1,25 +1,44 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db.models import Exists, OuterRef
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, permissions, status, viewsets
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from .custom_filters import IngredientFilter, RecipeFilter
-from .custom_pagination import CustomPagination
-from .serializers import (FavoriteCreateSerializer, IngredientSerializer,
-                          RecipeCreateSerializer, RecipeSerializer,
-                          ShoppingCartCreateSerializer, SubscriptionSerializer,
+from .custom_pagination import RecipePagination
+from .serializers import (IngredientSerializer, RecipeCreateSerializer,
+                          RecipeIdsSerializer, RecipeSerializer,
+                          ShortRecipeSerializer, SubscriptionSerializer,
                           TagSerializer)
-from api.recipes import custom_permissions
-from api.recipes.constants import SCALE_OF_NOTATION
-from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
-                            ShoppingCart, Tag)
+from .tags import tag_list_data
+from api.conditional import ConditionalResponseMixin
+from api.recipes import cache, custom_permissions
+from api.recipes.bulk import bulk_create_recipes
+from api.recipes.constants import (BULK_CREATE_BATCH_SIZE,
+                                   BULK_CREATE_MAX_ITEMS,
+                                   INGREDIENT_SEARCH_LIMIT,
+                                   SHOPPING_LIST_CHUNK_SIZE)
+from api.recipes.renderers import (CSVShoppingListRenderer,
+                                   PDFShoppingListRenderer,
+                                   TextShoppingListRenderer)
+from recipes import short_links, user_recipes
+from recipes.ingredient_index import ingredient_index
+from recipes.models import (Favorite, Ingredient, Recipe, ShoppingCart,
+                            ShoppingListItem, Tag)
 from users.models import Subscription
 
 
+def get_known_ids():
+    """Множества id тегов и ингредиентов из кэшей процесса."""
+    return (
+        {tag['id'] for tag in tag_list_data.get()},
+        ingredient_index.get_snapshot().ids,
+    )
+
+
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     """Вьюсет для тегов."""
 
@@ -28,6 +47,10 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     pagination_class = None
     permission_classes = (permissions.AllowAny,)
 
+    def list(self, request, *args, **kwargs):
+        """Список тегов из памяти процесса."""
+        return Response(tag_list_data.get())
+
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     """Вьюсет для ингредиентов."""
@@ -40,64 +63,167 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ('name',)
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        """Список ингредиентов из индекса в памяти, без запросов к БД."""
+        name = (request.query_params.get('name') or '').strip()
+        if name:
+            ingredients = ingredient_index.search(
+                name, limit=INGREDIENT_SEARCH_LIMIT
+            )
+        else:
+            ingredients = ingredient_index.all()
 
-class RecipeViewSet(viewsets.ModelViewSet):
+        serializer = self.get_serializer(ingredients, many=True)
+        return Response(serializer.data)
+
+
+class RecipeViewSet(ConditionalResponseMixin, viewsets.ModelViewSet):
     """Вьюсет для рецептов."""
 
     queryset = Recipe.objects.select_related('author').prefetch_related(
-        'tags', 'ingredient_list'
+        'tags', 'ingredient_list__ingredient'
     )
 
     permission_classes = (custom_permissions.IsAuthorOrReadOnly,)
-    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
-    search_fields = ('^name')
+    filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     filterset_fields = ('name', 'author')
-    pagination_class = CustomPagination
+    pagination_class = RecipePagination
+    last_modified_fields = ('updated_at', 'author__updated_at')
+    validator_fields = ('id', 'pub_date')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+
+        return queryset.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'),
+            )),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user, recipe=OuterRef('pk'),
+            )),
+            is_author_subscribed=Exists(Subscription.objects.filter(
+                user=user, author=OuterRef('author'),
+            )),
+        )
+
+    def get_validator_fields(self):
+        fields = super().get_validator_fields()
+        if self.request.user.is_authenticated:
+            fields += (
+                'is_favorited', 'is_in_shopping_cart', 'is_author_subscribed',
+            )
+        return fields
+
+    def get_dependency_versions(self):
+        versions = cache.get_versions((cache.TAGS, cache.INGREDIENTS))
+        return [
+            (version, cache.version_time(version))
+            for _, version in sorted(versions.items())
+        ]
+
+    def list(self, request, *args, **kwargs):
+        return cache.cached_response(
+            request, 'list', (cache.LIST,),
+            lambda: super(RecipeViewSet, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_field]
+        return cache.cached_response(
+            request, f'detail:{pk}',
+            (cache.recipe_dependency(pk), cache.TAGS, cache.INGREDIENTS),
+            lambda: super(RecipeViewSet, self).retrieve(
+                request, *args, **kwargs
+            ),
+            lambda data: (cache.author_dependency(data['author']['id']),),
+        )
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def perform_content_negotiation(self, request, force=False):
+        # Список покупок без подходящего Accept или ?format= отдаётся
+        # текстом, как до появления других форматов.
+        return super().perform_content_negotiation(
+            request, force=force or self.action == 'download_shopping_cart'
+        )
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return RecipeSerializer
         return RecipeCreateSerializer
 
-    def favorite_cart_mixin(self, request, pk, model, serializer, name):
-        """Функци для корзины/избранного."""
+    @action(
+        methods=['POST'],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+        url_path='bulk',
+    )
+    def bulk(self, request):
+        """Пакетное создание рецептов с ошибками по каждому элементу."""
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'Ожидается непустой список рецептов.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > BULK_CREATE_MAX_ITEMS:
+            return Response(
+                {'detail': f'Не больше {BULK_CREATE_MAX_ITEMS} рецептов '
+                           f'за запрос.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = bulk_create_recipes(
+            items, request.user, *get_known_ids(), BULK_CREATE_BATCH_SIZE
+        )
+        created = sum('id' in result for result in results)
+        if created == len(results):
+            response_status = status.HTTP_201_CREATED
+        elif created:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(
+            {'created': created, 'results': results}, status=response_status
+        )
 
-        user = self.request.user
-        recipe = get_object_or_404(Recipe, pk=pk)
+    def favorite_cart_mixin(self, request, pk, model, name):
+        """Функци для корзины/избранного.
 
-        exist = model.objects.filter(
-            user=user, recipe=recipe,
-        ).exists()
+        Добавление и удаление — по одному запросу к таблице model; по
+        результату видно, изменилось ли что-то. Существование рецепта
+        проверяется только для ответа об ошибке.
+        """
+        try:
+            recipe_pk = int(pk)
+        except ValueError:
+            raise Http404
 
+        user = self.request.user
         if request.method == 'POST':
-            if exist:
+            if user_recipes.add(model, user, [recipe_pk]):
+                recipe = Recipe.objects.get(pk=recipe_pk)
                 return Response(
-                    {'errors': f"Рецепт уже в {name}!"},
-                    status=status.HTTP_400_BAD_REQUEST,
+                    ShortRecipeSerializer(
+                        recipe, context={'request': request}
+                    ).data,
+                    status=status.HTTP_201_CREATED,
                 )
-            serializer = serializer(
-                data={'user': request.user.id, 'recipe': pk},
-                context={'request': request}
-            )
-
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            error = f"Рецепт уже в {name}!"
+        else:
+            if user_recipes.remove(model, user, [recipe_pk]):
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            error = f"Рецепта нет в {name}!"
 
-        if not exist:
-            return Response(
-                {'errors': f"Рецепта нет в {name}!"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        model.objects.filter(
-            user=user, recipe=recipe
-        ).delete()
-
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        get_object_or_404(Recipe.objects.only('id'), pk=recipe_pk)
+        return Response(
+            {'errors': error}, status=status.HTTP_400_BAD_REQUEST,
+        )
 
     @action(
         methods=['POST', 'DELETE'],
@@ -109,8 +235,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Функция для добавления/удаления избранных рецептов."""
 
         return self.favorite_cart_mixin(
-            request, pk, Favorite, FavoriteCreateSerializer,
-            'favorite'
+            request, pk, Favorite, 'favorite'
         )
 
     @action(
@@ -123,35 +248,89 @@ class RecipeViewSet(viewsets.ModelViewSet):
         """Функция для добавления/удаления списка покупок."""
 
         return self.favorite_cart_mixin(
-            request, pk, ShoppingCart, ShoppingCartCreateSerializer,
-            'shopping_cart'
+            request, pk, ShoppingCart, 'shopping_cart'
         )
 
+    def batch_mixin(self, request, model):
+        """Добавление/удаление нескольких рецептов одним запросом.
+
+        Ответ: changed — добавленные/удалённые, unchanged — уже
+        добавленные/отсутствовавшие, not_found — несуществующие рецепты.
+        """
+        serializer = RecipeIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = sorted(set(serializer.validated_data['recipes']))
+
+        if request.method == 'POST':
+            changed = user_recipes.add(model, request.user, recipe_ids)
+        else:
+            changed = user_recipes.remove(model, request.user, recipe_ids)
+        rest = set(recipe_ids).difference(changed)
+        existing = set(Recipe.objects.filter(pk__in=rest).values_list(
+            'pk', flat=True
+        )) if rest else set()
+        return Response({
+            'changed': changed,
+            'unchanged': sorted(existing),
+            'not_found': sorted(rest - existing),
+        })
+
+    @action(
+        methods=['POST', 'DELETE'],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+        url_path='favorite',
+    )
+    def favorite_batch(self, request):
+        """Пакетное добавление/удаление избранных рецептов."""
+        return self.batch_mixin(request, Favorite)
+
+    @action(
+        methods=['POST', 'DELETE'],
+        detail=False,
+        permission_classes=(permissions.IsAuthenticated,),
+        url_path='shopping_cart',
+    )
+    def shopping_cart_batch(self, request):
+        """Пакетное добавление/удаление рецептов списка покупок."""
+        return self.batch_mixin(request, ShoppingCart)
+
     @action(
         methods=['GET'],
         detail=False,
         permission_classes=(permissions.IsAuthenticated,),
+        renderer_classes=(
+            TextShoppingListRenderer,
+            CSVShoppingListRenderer,
+            PDFShoppingListRenderer,
+        ),
         url_path='download_shopping_cart',
     )
     def download_shopping_cart(self, request):
-        ingredients = RecipeIngredient.objects.filter(
-            recipe__shopping_carts__user=self.request.user
-        ).values(
-            'ingredient__name', 'ingredient__measurement_unit'
-        ).annotate(sum=Sum('amount')).order_by(
+        """Скачивание списка покупок (?format=txt|csv|pdf) потоком."""
+        ingredients = ShoppingListItem.objects.filter(
+            user=self.request.user
+        ).order_by(
             'ingredient__name'
+        ).values_list(
+            'ingredient__name', 'ingredient__measurement_unit', 'total_amount'
+        ).iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+
+        renderer = request.accepted_renderer
+        renderer.prepare()
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+
+        response = StreamingHttpResponse(
+            renderer.stream(ingredients),
+            content_type=content_type,
+            status=status.HTTP_200_OK,
         )
-
-        answer_text = 'Список необходмых ингредиентов:\n\n'
-        for ingredient in ingredients:
-            name, unit, sum = ingredient.values()
-            answer_text += f"{name}: {sum} {unit}\n"
-
-        return HttpResponse(
-            answer_text,
-            content_type='text/plain',
-            status=status.HTTP_200_OK
+        response['Content-Disposition'] = (
+            f'attachment; filename="shopping_list.{renderer.format}"'
         )
+        return response
 
     @action(
         methods=['GET'],
@@ -160,8 +339,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
         url_path='get-link',
     )
     def short_link(self, request, pk):
-        """Генератор коротких ссылок формата /s/<slug>/."""
-        link_part = reverse('short_link_handler', args=[hex(int(pk))])
+        """Генератор коротких ссылок формата /s/<code>/."""
+        recipe = get_object_or_404(Recipe.objects.only('id'), pk=pk)
+        link_part = reverse(
+            'short_link_handler', args=[short_links.get_code(recipe)]
+        )
         short_link = request.build_absolute_uri(link_part)
         return Response(
             {'short-link': short_link},
@@ -169,11 +351,17 @@ class RecipeViewSet(viewsets.ModelViewSet):
         )
 
 
+def get_short_link_target(request, recipe_pk):
+    if recipe_pk is None:
+        raise Http404('Ссылка не найдена.')
+    return request.build_absolute_uri(f'/recipes/{recipe_pk}/')
+
+
 def short_link_handler(request, slug):
     """Приниматор коротких ссылок и переадрессатор на рецепт."""
-    recipe_pk = int(slug, SCALE_OF_NOTATION)
-    full_link = request.build_absolute_uri(f'/recipes/{recipe_pk}/')
-    return redirect(full_link)
+    target = get_short_link_target(request, short_links.resolve(slug))
+    short_links.record_hit(slug)
+    return redirect(target)
 
 
 class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -0,0 +1,49 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.recipes import cache
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.models import User
+
+NOT_PROFILE_FIELDS = frozenset(('last_login', 'password'))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def invalidate_recipe(sender, instance, **kwargs):
+    cache.invalidate(cache.LIST, cache.recipe_dependency(instance.pk))
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def invalidate_recipe_ingredients(sender, instance, **kwargs):
+    cache.invalidate(cache.LIST, cache.recipe_dependency(instance.recipe_id))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        cache.invalidate(cache.LIST, cache.recipe_dependency(instance.pk))
+    elif pk_set is None:
+        # tag.recipes.clear(): затронутые рецепты неизвестны.
+        cache.invalidate(cache.LIST, cache.TAGS)
+    else:
+        cache.invalidate(cache.LIST, *map(cache.recipe_dependency, pk_set))
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tags(sender, **kwargs):
+    cache.invalidate(cache.LIST, cache.TAGS)
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredients(sender, **kwargs):
+    cache.invalidate(cache.LIST, cache.INGREDIENTS)
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_author(sender, instance, update_fields=None, **kwargs):
+    if update_fields and NOT_PROFILE_FIELDS.issuperset(update_fields):
+        return
+    cache.invalidate(cache.LIST, cache.author_dependency(instance.pk))
@@ -0,0 +1,57 @@
+"""Быстрые маршруты ASGI-обработчика."""
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import TestCase
+
+from backend.warm_up import warm_up
+
+from api.asgi import FastPathASGIHandler
+from recipes.models import Tag
+
+
+class FastPathTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.create(name='Завтрак', slug='breakfast')
+
+    def setUp(self):
+        # Как после lifespan startup: быстрые маршруты отвечают из кэшей
+        # процесса, не обращаясь к базе.
+        cache.clear()
+        warm_up()
+
+    def request(self, method, path):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            'type': 'http', 'method': method, 'path': path,
+            'query_string': b'', 'headers': [], 'root_path': '',
+            'server': ('testserver', 80), 'scheme': 'http',
+        }
+        handler = FastPathASGIHandler()
+        with self.assertLogs('api.instrumentation', 'INFO') as logs:
+            async_to_sync(handler)(scope, receive, send)
+        start, body = messages
+        return start, body['body'], logs.records
+
+    def test_security_headers_and_logging(self):
+        start, body, records = self.request('GET', '/api/tags/')
+        self.assertEqual(start['status'], 200)
+        headers = dict(start['headers'])
+        self.assertEqual(headers[b'X-Content-Type-Options'], b'nosniff')
+        self.assertEqual(headers[b'X-Frame-Options'], b'DENY')
+        self.assertIn(b'Server-Timing', headers)
+        self.assertIn(b'breakfast', body)
+        self.assertEqual(records[0].route, 'tags-list')
+
+    def test_head_has_no_body(self):
+        start, body, _ = self.request('HEAD', '/api/tags/')
+        self.assertEqual(start['status'], 200)
+        self.assertEqual(body, b'')
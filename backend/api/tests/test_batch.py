@@ -0,0 +1,92 @@
+"""Пакетное добавление и удаление избранного и списка покупок."""
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.recipes.constants import BATCH_MAX_RECIPES
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingListItem)
+from users.models import User
+
+MISSING = 999_999
+
+
+class BatchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='pass',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        ingredient = Ingredient.objects.create(
+            name='картофель', measurement_unit='г'
+        )
+        cls.recipes = []
+        for number in range(3):
+            recipe = Recipe.objects.create(
+                author=cls.user, name=f'Рецепт {number}', text='Текст',
+                cooking_time=10, image='recipes/test.jpg',
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=ingredient, amount=100
+            )
+            cls.recipes.append(recipe.pk)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def send(self, method, target, recipes):
+        response = getattr(self.client, method)(
+            f'/api/recipes/{target}/', {'recipes': recipes}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_favorite_add_and_remove(self):
+        first, second, third = self.recipes
+        self.assertEqual(
+            self.send('post', 'favorite', [first, second, MISSING, first]),
+            {'changed': [first, second], 'unchanged': [],
+             'not_found': [MISSING]},
+        )
+        self.assertEqual(
+            self.send('post', 'favorite', [first]),
+            {'changed': [], 'unchanged': [first], 'not_found': []},
+        )
+        self.assertEqual(
+            self.send('delete', 'favorite', [first, third]),
+            {'changed': [first], 'unchanged': [third], 'not_found': []},
+        )
+        self.assertEqual(
+            list(Favorite.objects.values_list('recipe', flat=True)),
+            [second],
+        )
+        counts = dict(Recipe.objects.values_list('pk', 'favorites_count'))
+        self.assertEqual(counts, {first: 0, second: 1, third: 0})
+
+    def test_shopping_cart_updates_shopping_list(self):
+        self.send('post', 'shopping_cart', self.recipes)
+        self.assertEqual(
+            list(ShoppingListItem.objects.values_list(
+                'user', 'total_amount'
+            )),
+            [(self.user.pk, 300)],
+        )
+        self.send('delete', 'shopping_cart', self.recipes[:2])
+        self.assertEqual(
+            ShoppingListItem.objects.get().total_amount, 100
+        )
+
+    def test_invalid_requests(self):
+        for recipes in ([], ['x'], list(range(1, BATCH_MAX_RECIPES + 2))):
+            response = self.client.post(
+                '/api/recipes/favorite/', {'recipes': recipes}, format='json'
+            )
+            self.assertEqual(response.status_code, 400)
+        response = APIClient().post(
+            '/api/recipes/favorite/', {'recipes': [1]}, format='json'
+        )
+        self.assertEqual(response.status_code, 401)
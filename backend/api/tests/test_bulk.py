@@ -0,0 +1,127 @@
+"""Пакетное создание рецептов (POST /api/recipes/bulk/)."""
+import base64
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from backend.warm_up import warm_up
+
+from recipes.ingredient_index import ingredient_index
+from recipes.models import Ingredient, Recipe, Tag
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+URL = '/api/recipes/bulk/'
+
+
+def image_data():
+    buffer = BytesIO()
+    Image.new('RGB', (10, 10), 'red').save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_EAGER=False)
+class BulkCreateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Автор', last_name='Тестовый', password='pass',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.tags = [
+            Tag.objects.create(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(2)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(2)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(os.path.join(MEDIA_ROOT, 'recipes'), ignore_errors=True)
+        cache.clear()
+        # Индекс ингредиентов мог остаться от других тестов: их данные
+        # откатываются без фиксации, и версия индекса не меняется.
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient_index.invalidate()
+        warm_up()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def payload(self, number, **fields):
+        tag = self.tags[number % 2]
+        ingredient = self.ingredients[number % 2]
+        return {
+            'name': f'Рецепт {number}',
+            'text': 'Текст',
+            'cooking_time': 10,
+            'image': image_data(),
+            'tags': [tag.pk],
+            'ingredients': [{'id': ingredient.pk, 'amount': number + 1}],
+            **fields,
+        }
+
+    def stored_images(self):
+        directory = os.path.join(MEDIA_ROOT, 'recipes')
+        return os.listdir(directory) if os.path.isdir(directory) else []
+
+    def test_valid_items_are_created_in_order(self):
+        items = [self.payload(number) for number in range(4)]
+        items[2]['tags'] = [424242]
+        response = self.client.post(URL, items, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['created'], 3)
+        results = response.data['results']
+        self.assertEqual([result['index'] for result in results], [0, 1, 2, 3])
+        self.assertIn('tags', results[2]['errors'])
+
+        for number in (0, 1, 3):
+            recipe = Recipe.objects.get(pk=results[number]['id'])
+            self.assertEqual(recipe.name, f'Рецепт {number}')
+            self.assertEqual(
+                list(recipe.tags.values_list('pk', flat=True)),
+                [self.tags[number % 2].pk],
+            )
+            self.assertEqual(
+                list(recipe.ingredient_list.values_list(
+                    'ingredient', 'amount'
+                )),
+                [(self.ingredients[number % 2].pk, number + 1)],
+            )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.recipes_count, 3)
+        self.assertEqual(len(self.stored_images()), 3)
+
+    def test_failed_batch_removes_its_images(self):
+        items = [self.payload(number) for number in range(2)]
+        with mock.patch(
+            'api.recipes.bulk.counters.increment',
+            side_effect=DatabaseError('сбой'),
+        ), self.assertLogs('api.recipes.bulk', 'ERROR'):
+            response = self.client.post(URL, items, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+        self.assertFalse(Recipe.objects.exists())
+        self.assertEqual(self.stored_images(), [])
@@ -0,0 +1,103 @@
+"""Выгрузка каталога в NDJSON и загрузка обратно."""
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.recipes import cache
+from recipes.catalog import dump_recipe
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.models import User
+
+
+class CatalogTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Автор', last_name='Тестовый', password='pass',
+        )
+        tags = [
+            Tag.objects.create(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(2)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(3)
+        ]
+        for number in range(3):
+            recipe = Recipe.objects.create(
+                author=author, name=f'Рецепт {number}', text='Текст',
+                cooking_time=10 + number, image=f'recipes/{number}.jpg',
+            )
+            recipe.tags.set(tags[:number + 1])
+            for ingredient in ingredients[:number + 1]:
+                RecipeIngredient.objects.create(
+                    recipe=recipe, ingredient=ingredient, amount=number + 1
+                )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'catalog.ndjson')
+        self.id_map = os.path.join(directory.name, 'ids.csv')
+
+    def export(self):
+        call_command('export_catalog', self.path, stdout=StringIO())
+        with open(self.path, encoding='utf-8') as file:
+            return [json.loads(line) for line in file]
+
+    def load(self):
+        stderr = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            result = call_command(
+                'import_catalog', self.path, '--id-map', self.id_map,
+                '--batch-size', '2', stdout=StringIO(), stderr=stderr,
+            )
+        with open(self.id_map, encoding='utf-8') as file:
+            id_map = {int(old): int(new) for old, new in csv.reader(file)}
+        return result, stderr.getvalue(), id_map
+
+    def test_round_trip(self):
+        records = self.export()
+        self.assertEqual(len(records), 3)
+
+        result, errors, id_map = self.load()
+        self.assertIn('Загружено рецептов: 3, с ошибками: 0', result)
+        self.assertEqual(errors, '')
+        self.assertEqual(set(id_map), {record['id'] for record in records})
+
+        imported = Recipe.objects.in_bulk(id_map.values())
+        for record in records:
+            copy = dump_recipe(imported[id_map[record['id']]])
+            self.assertEqual(copy.pop('id'), id_map[record['id']])
+            record.pop('id')
+            self.assertEqual(copy, record)
+        author = User.objects.get(email='author@example.com')
+        self.assertEqual(author.recipes_count, 6)
+
+    def test_bad_lines_do_not_abort_import(self):
+        records = self.export()
+        records[1]['author']['email'] = 'missing@example.com'
+        lines = [json.dumps(record) for record in records]
+        lines.insert(1, '{"name": "обрыв')
+        lines.append('не JSON')
+        with open(self.path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        version = cache.get_versions([cache.LIST])
+
+        result, errors, id_map = self.load()
+        self.assertIn('Загружено рецептов: 2, с ошибками: 3', result)
+        for line in (2, 3, 5):
+            self.assertIn(f'Запись {line}:', errors)
+        self.assertEqual(
+            set(id_map), {records[0]['id'], records[2]['id']}
+        )
+        self.assertNotEqual(cache.get_versions([cache.LIST]), version)
@@ -0,0 +1,81 @@
+"""ETag/Last-Modified и кэш ответов для рецептов."""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Favorite, Ingredient, Recipe, Tag
+from users.models import User
+
+
+class ConditionalResponseTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='pass',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        cls.tag = Tag.objects.create(name='Завтрак', slug='breakfast')
+        cls.recipe = Recipe.objects.create(
+            author=cls.user, name='Каша', text='Текст', cooking_time=10,
+            image='recipes/test.jpg',
+        )
+        cls.recipe.tags.set([cls.tag])
+        cls.url = f'/api/recipes/{cls.recipe.pk}/'
+
+    def setUp(self):
+        cache.clear()
+        self.anonymous = APIClient()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def change(self, func):
+        """Изменение данных с фиксацией: сигналы меняют версии кэша."""
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+
+    def test_not_modified(self):
+        for url in (self.url, '/api/recipes/'):
+            response = self.anonymous.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Last-Modified', response)
+            repeated = self.anonymous.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            self.assertEqual(repeated.status_code, 304)
+            self.assertEqual(repeated['ETag'], response['ETag'])
+
+    def test_dependencies_change_validators(self):
+        def rename_tag():
+            self.tag.name = 'Обед'
+            self.tag.save()
+
+        def add_ingredient():
+            Ingredient.objects.create(name='соль', measurement_unit='г')
+
+        def edit_recipe():
+            Recipe.objects.get(pk=self.recipe.pk).save()
+
+        etag = self.anonymous.get(self.url)['ETag']
+        for change in (rename_tag, add_ingredient, edit_recipe):
+            self.change(change)
+            response = self.anonymous.get(
+                self.url, HTTP_IF_NONE_MATCH=etag
+            )
+            self.assertEqual(response.status_code, 200, change.__name__)
+            self.assertEqual(response['X-Cache'], 'MISS', change.__name__)
+            etag = response['ETag']
+
+    def test_personal_fields_change_etag(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('Last-Modified', response)
+        self.assertFalse(response.data['is_favorited'])
+
+        Favorite.objects.create(user=self.user, recipe=self.recipe)
+        changed = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(changed.status_code, 200)
+        self.assertTrue(changed.data['is_favorited'])
@@ -0,0 +1,111 @@
+"""Очередь фоновых задач и обработчик run_worker."""
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+
+CALLS = []
+
+
+def record(value):
+    CALLS.append(value)
+
+
+def fail():
+    raise RuntimeError('Ошибка задачи')
+
+
+@override_settings(JOBS_EAGER=False)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        CALLS.clear()
+
+    def test_job_runs_after_claim(self):
+        job = queue.enqueue(record, 1)
+        self.assertEqual(job.task, 'api.tests.test_jobs.record')
+        claimed = queue.claim('test', limit=5)
+        self.assertEqual(claimed, [job])
+        self.assertEqual(queue.claim('test', limit=5), [])
+
+        queue.execute(claimed[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(CALLS, [1])
+
+    def test_failed_job_is_retried_then_failed(self):
+        queue.enqueue(fail, max_attempts=2)
+        job, = queue.claim('test')
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            queue.execute(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        job, = queue.claim('test')
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            queue.execute(job)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_jobs_are_requeued(self):
+        queue.enqueue(record, 1)
+        job, = queue.claim('test')
+        Job.objects.update(started_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(queue.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+
+    def test_prune_keeps_recent_and_unfinished_jobs(self):
+        old = timezone.now() - timedelta(days=10)
+        for status, finished_at in (
+            (Job.DONE, old),
+            (Job.FAILED, old),
+            (Job.DONE, timezone.now()),
+            (Job.QUEUED, None),
+        ):
+            Job.objects.create(
+                task='api.tests.test_jobs.record', status=status,
+                finished_at=finished_at, run_at=timezone.now(),
+            )
+        self.assertEqual(queue.prune(days=7, batch_size=1), 2)
+        self.assertEqual(Job.objects.count(), 2)
+
+    @override_settings(JOBS_EAGER=True)
+    def test_eager_job_errors_are_logged(self):
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertIsNone(queue.enqueue(fail))
+                queue.enqueue(record, 2)
+        self.assertEqual(CALLS, [2])
+        self.assertFalse(Job.objects.exists())
+
+    def test_worker_survives_database_errors(self):
+        queue.enqueue(record, 1)
+        queue.enqueue(record, 2)
+        stdout = StringIO()
+        with mock.patch(
+            'jobs.management.commands.run_worker.execute',
+            side_effect=OperationalError('server closed the connection'),
+        ), self.assertLogs(
+            'jobs.management.commands.run_worker', 'ERROR'
+        ) as logs:
+            call_command(
+                'run_worker', '--burst', '--concurrency', '1',
+                stdout=stdout,
+            )
+        self.assertEqual(len(logs.records), 2)
+        self.assertIn('Обработано задач: 0, с ошибкой: 2', stdout.getvalue())
+        self.assertEqual(
+            set(Job.objects.values_list('status', flat=True)), {Job.RUNNING}
+        )
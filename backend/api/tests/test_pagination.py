@@ -0,0 +1,59 @@
+"""Курсорная и постраничная пагинация списка рецептов."""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from recipes.models import Recipe
+from users.models import User
+
+
+class RecipePaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Автор', last_name='Тестовый', password='pass',
+        )
+        # Самый релевантный рецепт (слово в названии) — самый старый.
+        for name, text in (
+            ('Борщ', 'Борщ со сметаной'),
+            ('Щи', 'Не борщ'),
+            ('Солянка', 'Почти борщ'),
+            ('Окрошка', 'Холодный суп'),
+        ):
+            Recipe.objects.create(
+                author=author, name=name, text=text, cooking_time=10,
+                image='recipes/test.jpg',
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get_names(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [
+            recipe['name'] for recipe in response.data['results']
+        ]
+
+    def test_cursor_follows_date_order(self):
+        response, names = self.get_names('/api/recipes/?cursor=&limit=3')
+        self.assertEqual(names, ['Окрошка', 'Солянка', 'Щи'])
+        self.assertNotIn('count', response.data)
+        _, names = self.get_names(response.data['next'])
+        self.assertEqual(names, ['Борщ'])
+
+    def test_search_keeps_relevance_order_with_cursor(self):
+        _, ranked = self.get_names('/api/recipes/', {'search': 'борщ'})
+        self.assertEqual(ranked[0], 'Борщ')
+        self.assertEqual(len(ranked), 3)
+
+        response, names = self.get_names(
+            '/api/recipes/', {'search': 'борщ', 'cursor': '', 'limit': 2}
+        )
+        self.assertEqual(names, ranked[:2])
+        self.assertEqual(response.data['count'], 3)
+        _, names = self.get_names(response.data['next'])
+        self.assertEqual(names, ranked[2:])
@@ -0,0 +1,144 @@
+"""Число SQL-запросов основных GET-маршрутов не зависит от размера
+страницы и укладывается в QUERY_BUDGETS."""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from backend.warm_up import warm_up
+
+from api.instrumentation import query_budget
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from recipes.shopping_list import rebuild
+from users.models import Subscription, User
+
+AUTHORS = 12
+RECIPES_PER_AUTHOR = 2
+PAGE_SIZES = (1, 10)
+
+
+class QueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = [
+            Tag.objects.create(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'ингредиент {number}', measurement_unit='г'
+            )
+            for number in range(5)
+        ]
+        cls.user = User.objects.create_user(
+            email='reader@example.com', username='reader',
+            first_name='Читатель', last_name='Тестовый', password='pass',
+        )
+        authors = [
+            User.objects.create_user(
+                email=f'author{number}@example.com',
+                username=f'author{number}',
+                first_name='Автор', last_name=str(number), password='pass',
+            )
+            for number in range(AUTHORS)
+        ]
+        for author in authors:
+            for number in range(RECIPES_PER_AUTHOR):
+                recipe = Recipe.objects.create(
+                    author=author, name=f'Рецепт {author.pk}-{number}',
+                    text='Текст', cooking_time=10,
+                    image='recipes/test.jpg',
+                )
+                recipe.tags.set(tags[:2])
+                RecipeIngredient.objects.bulk_create(
+                    RecipeIngredient(
+                        recipe=recipe, ingredient=ingredient, amount=10
+                    )
+                    for ingredient in ingredients[:3]
+                )
+                Favorite.objects.create(user=cls.user, recipe=recipe)
+                ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+            Subscription.objects.create(user=cls.user, author=author)
+        rebuild()
+        cls.recipe = recipe
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        # Кэши процесса (теги, ингредиенты) в работающем воркере уже
+        # заполнены, их построение в бюджет не входит.
+        warm_up()
+        self.anonymous = APIClient()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get(self, client, route, url):
+        """Выполняет GET в пределах бюджета; возвращает число запросов."""
+        with query_budget(route) as counter:
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200, url)
+        return counter.count
+
+    def assertPageSizeIndependent(self, client, route, url):
+        counts = [
+            self.get(client, route, url.format(limit=limit))
+            for limit in PAGE_SIZES
+        ]
+        self.assertEqual(len(set(counts)), 1, f'{url}: {counts}')
+
+    def test_recipes_list(self):
+        for client in (self.anonymous, self.client):
+            with self.subTest(authenticated=client is self.client):
+                self.assertPageSizeIndependent(
+                    client, 'recipes-list', '/api/recipes/?limit={limit}'
+                )
+
+    def test_recipes_list_filters(self):
+        self.assertPageSizeIndependent(
+            self.client, 'recipes-list',
+            '/api/recipes/?limit={limit}&is_favorited=1'
+            '&is_in_shopping_cart=1&tags=tag-0',
+        )
+
+    def test_recipes_detail(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        self.get(self.anonymous, 'recipes-detail', url)
+        self.get(self.client, 'recipes-detail', url)
+
+    def test_users_list(self):
+        for client in (self.anonymous, self.client):
+            with self.subTest(authenticated=client is self.client):
+                self.assertPageSizeIndependent(
+                    client, 'users-list', '/api/users/?limit={limit}'
+                )
+
+    def test_users_detail(self):
+        url = f'/api/users/{self.recipe.author_id}/'
+        self.get(self.anonymous, 'users-detail', url)
+        self.get(self.client, 'users-detail', url)
+
+    def test_users_me(self):
+        self.get(self.client, 'users-me', '/api/users/me/')
+
+    def test_subscriptions(self):
+        self.assertPageSizeIndependent(
+            self.client, 'users-subscriptions',
+            '/api/users/subscriptions/?limit={limit}&recipes_limit=1',
+        )
+        self.get(
+            self.client, 'users-subscriptions',
+            '/api/users/subscriptions/?limit=10',
+        )
+
+    def test_download_shopping_cart(self):
+        for file_format in ('txt', 'csv', 'pdf'):
+            with self.subTest(format=file_format):
+                self.get(
+                    self.client, 'recipes-download-shopping-cart',
+                    f'/api/recipes/download_shopping_cart/'
+                    f'?format={file_format}',
+                )
@@ -0,0 +1,107 @@
+"""Варианты изображений создаются фоновой задачей для каждого файла
+отдельно, а ссылки на них строятся без обращения к хранилищу."""
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase, override_settings
+from PIL import Image
+from rest_framework.test import APIClient
+
+from jobs.queue import claim, execute
+from recipes.models import Recipe
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_file(color, file_format, name):
+    buffer = BytesIO()
+    Image.new('RGB', (800, 600), color).save(buffer, file_format)
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_EAGER=False)
+class RenditionTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='author@example.com', username='author',
+            first_name='Автор', last_name='Тестовый', password='pass',
+        )
+
+    def create_recipe(self, color, file_format, name):
+        return Recipe.objects.create(
+            author=self.author, name=f'Рецепт {name}', text='Текст',
+            cooking_time=10, image=image_file(color, file_format, name),
+        )
+
+    def run_jobs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for job in claim('test', limit=100):
+                self.assertEqual(execute(job).status, job.DONE)
+
+    def get_renditions(self, recipe):
+        # Хранилище не опрашивается при построении ссылок.
+        with mock.patch.object(
+            FileSystemStorage, 'exists', side_effect=AssertionError
+        ):
+            response = self.client.get(f'/api/recipes/{recipe.pk}/')
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_renditions_of_same_named_uploads_differ(self):
+        red = self.create_recipe('red', 'PNG', 'temp.png')
+        blue = self.create_recipe('blue', 'JPEG', 'temp.jpeg')
+        self.run_jobs()
+
+        for recipe, color in ((red, (255, 0, 0)), (blue, (0, 0, 255))):
+            recipe.refresh_from_db()
+            self.assertEqual(recipe.rendered_image, recipe.image.name)
+            urls = self.get_renditions(recipe).data['image_renditions']
+            self.assertIn(recipe.image.name, urls['thumbnail'])
+            name = f'renditions/{recipe.image.name}_thumbnail.jpg'
+            with recipe.image.storage.open(name) as file:
+                pixel = Image.open(file).convert('RGB').getpixel((10, 10))
+            for actual, expected in zip(pixel, color):
+                self.assertAlmostEqual(actual, expected, delta=10)
+
+    def test_original_served_until_renditions_are_ready(self):
+        recipe = self.create_recipe('green', 'PNG', 'temp.png')
+        before = self.get_renditions(recipe)
+        self.assertEqual(before['X-Cache'], 'MISS')
+        self.assertEqual(
+            set(before.data['image_renditions'].values()),
+            {before.data['image']},
+        )
+
+        self.run_jobs()
+        after = self.get_renditions(recipe)
+        self.assertEqual(after['X-Cache'], 'MISS')
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertNotIn(
+            after.data['image'], after.data['image_renditions'].values()
+        )
+
+    def test_new_file_needs_new_renditions(self):
+        recipe = self.create_recipe('red', 'PNG', 'temp.png')
+        self.run_jobs()
+        recipe.image = image_file('blue', 'PNG', 'temp.png')
+        recipe.save()
+
+        recipe.refresh_from_db()
+        self.assertNotEqual(recipe.rendered_image, recipe.image.name)
+        self.run_jobs()
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.rendered_image, recipe.image.name)
@@ -0,0 +1,61 @@
+"""Скачивание списка покупок в разных форматах."""
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient, ShoppingCart
+from recipes.shopping_list import rebuild
+from users.models import User
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingListDownloadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='user@example.com', username='user',
+            first_name='Имя', last_name='Фамилия', password='pass',
+        )
+        recipe = Recipe.objects.create(
+            author=cls.user, name='Суп', text='Текст', cooking_time=10,
+            image='recipes/test.jpg',
+        )
+        RecipeIngredient.objects.create(
+            recipe=recipe,
+            ingredient=Ingredient.objects.create(
+                name='картофель', measurement_unit='г'
+            ),
+            amount=300,
+        )
+        ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+        rebuild()
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def download(self, file_format):
+        response = self.client.get(URL, {'format': file_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_formats(self):
+        self.assertIn('картофель: 300 г', self.download('txt').decode())
+        self.assertIn(
+            'картофель,300,г', self.download('csv').decode().splitlines()
+        )
+        self.assertTrue(self.download('pdf').startswith(b'%PDF'))
+
+    @override_settings(SHOPPING_LIST_PDF_FONT='/nonexistent/font.ttf')
+    def test_missing_font_fails_before_streaming(self):
+        with mock.patch(
+            'reportlab.pdfbase.pdfmetrics.getRegisteredFontNames',
+            return_value=[],
+        ), self.assertRaises(ImproperlyConfigured):
+            self.client.get(URL, {'format': 'pdf'})
@@ -1,6 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .metrics import MetricsView
 from .recipes.views import IngredientViewSet, RecipeViewSet, TagViewSet
 from .users.views import UserViewSet
 
@@ -11,6 +12,7 @@ api_v1.register(r'tags', TagViewSet, basename='tags')
 api_v1.register(r'recipes', RecipeViewSet, basename='recipes')
 
 urlpatterns = [
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include(api_v1.urls)),
     path('auth/', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
@@ -1,13 +1,39 @@
 import base64
+import binascii
 
 from django.core.files.base import ContentFile
 from rest_framework import serializers
 
+from recipes.renditions import get_rendition_urls
+
 
 class Base64ImageField(serializers.ImageField):
     def to_internal_value(self, data):
         if isinstance(data, str) and data.startswith('data:image'):
-            format, imgstr = data.split(';base64,')
+            try:
+                format, imgstr = data.split(';base64,')
+                content = base64.b64decode(imgstr)
+            except (ValueError, binascii.Error):
+                self.fail('invalid_image')
             ext = format.split('/')[-1]
-            data = ContentFile(base64.b64decode(imgstr), name='temp.' + ext)
+            data = ContentFile(content, name='temp.' + ext)
         return super().to_internal_value(data)
+
+
+class ImageRenditionsField(serializers.ReadOnlyField):
+    """Ссылки на уменьшенные и WebP-варианты изображения из поля field."""
+
+    def __init__(self, field, **kwargs):
+        self.field = field
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        urls = get_rendition_urls(instance, self.field)
+        request = self.context.get('request')
+        if request is not None:
+            urls = {
+                rendition: request.build_absolute_uri(url)
+                for rendition, url in urls.items()
+            }
+        return urls
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
-from api.users.fields import Base64ImageField
+from api.users.fields import Base64ImageField, ImageRenditionsField
 from users.constants import MAX_USERNAME_LEN
 from users.models import Subscription
 
@@ -20,6 +20,8 @@ class UserSerializer(serializers.ModelSerializer):
         allow_null=True,
     )
 
+    avatar_renditions = ImageRenditionsField('avatar')
+
     is_subscribed = serializers.SerializerMethodField(
         read_only=True,
     )
@@ -28,7 +30,8 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = (
             'email', 'id', 'username', 'first_name',
-            'last_name', 'avatar', 'is_subscribed',
+            'last_name', 'avatar', 'avatar_renditions', 'is_subscribed',
+            'subscribers_count',
         )
 
     def validate(self, attrs):
@@ -38,6 +41,8 @@ class UserSerializer(serializers.ModelSerializer):
 
     def get_is_subscribed(self, obj):
         request = self.context.get('request')
+        if hasattr(obj, 'is_subscribed'):
+            return obj.is_subscribed
 
         return (
             request and request.user.is_authenticated
@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from rest_framework.exceptions import ValidationError
+
+from recipes.models import Recipe
+
+
+def get_recipes_limit(request):
+    """Значение параметра recipes_limit (None, если не указан)."""
+    recipes_limit = request.query_params.get('recipes_limit')
+    if not recipes_limit:
+        return None
+    try:
+        recipes_limit = int(recipes_limit)
+    except ValueError:
+        recipes_limit = 0
+    if recipes_limit < 1:
+        raise ValidationError(
+            {'recipes_limit': 'Укажите целое положительное число.'}
+        )
+    return recipes_limit
+
+
+def get_latest_recipes(author_ids, limit=None):
+    """Последние рецепты авторов одним запросом.
+
+    Для limit используется ROW_NUMBER() по каждому автору; Django 3.2 не
+    умеет фильтровать по оконным функциям, поэтому оконный запрос
+    подставляется в условие как подзапрос.
+    """
+    recipes = Recipe.objects.filter(author__in=author_ids)
+    if limit is not None:
+        numbered = recipes.annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=F('author'),
+            order_by=(F('pub_date').desc(), F('id').asc()),
+        )).order_by().values('id', 'row_number')
+        sql, params = numbered.query.sql_with_params()
+        recipes = Recipe.objects.filter(id__in=RawSQL(
+            f'SELECT numbered.id FROM ({sql}) numbered '
+            'WHERE numbered.row_number <= %s',
+            (*params, limit),
+        ))
+
+    latest_recipes = defaultdict(list)
+    for recipe in recipes.order_by('-pub_date', 'id'):
+        latest_recipes[recipe.author_id].append(recipe)
+    return latest_recipes
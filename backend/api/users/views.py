@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef, Value
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from djoser import views as djoser_views
 from rest_framework import permissions, status
@@ -6,31 +8,49 @@ from rest_framework.decorators import action
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 
-from api.recipes.serializers import (SubscriptionCreateSerializer,
-                                     SubscriptionSerializer)
+from api.conditional import ConditionalResponseMixin
+from api.recipes.serializers import SubscriptionSerializer
 from api.users.serializers import UserSerializer
+from api.users.subscriptions import get_latest_recipes, get_recipes_limit
+from users import subscriptions
 from users.models import Subscription
 
 User = get_user_model()
 
 
-class UserViewSet(djoser_views.UserViewSet):
+class UserViewSet(ConditionalResponseMixin, djoser_views.UserViewSet):
     """Вьюсет для пользователей."""
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = LimitOffsetPagination
     permission_classes = (permissions.AllowAny,)
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+
+        return queryset.annotate(is_subscribed=Exists(
+            Subscription.objects.filter(user=user, author=OuterRef('pk'))
+        ))
+
+    def get_validator_fields(self):
+        fields = super().get_validator_fields()
+        if self.request.user.is_authenticated:
+            fields += ('is_subscribed',)
+        return fields
+
     def retrieve(self, request, *args, **kwargs):
         if self.action != 'me':
-            return super().retrieve(self, request, *args, **kwargs)
+            return super().retrieve(request, *args, **kwargs)
 
         if self.request.user.is_anonymous:
             return Response(status=status.HTTP_401_UNAUTHORIZED)
 
-        kwargs = {'id': request.user.pk}
+        self.kwargs[self.lookup_field] = request.user.pk
         self.action = 'retrieve'
-        return super().retrieve(self, request, *args, **kwargs)
+        return super().retrieve(request, *args, **kwargs)
 
     @action(
         methods=['PUT', 'DELETE'],
@@ -54,7 +74,10 @@ class UserViewSet(djoser_views.UserViewSet):
                 status=status.HTTP_200_OK,
             )
 
-        User.objects.filter(pk=user.id).update(avatar=None)
+        # Через save(), а не update(): сохранение сдвигает updated_at и
+        # отправляет post_save, который сбрасывает кэш ответов с автором.
+        user.avatar = None
+        user.save(update_fields=['avatar', 'updated_at'])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
@@ -64,44 +87,41 @@ class UserViewSet(djoser_views.UserViewSet):
         url_path='subscribe',
     )
     def subscribe(self, request, id):
-        """Функция для подписки на других пользователей."""
+        """Функция для подписки на других пользователей.
+
+        Подписка и отписка — по одному запросу к таблице подписок;
+        существование автора проверяется только для ответа об ошибке.
+        """
+        try:
+            author_id = int(id)
+        except ValueError:
+            raise Http404
+
         user = self.request.user
-        to_sub = get_object_or_404(User, pk=id)
-        if user == to_sub:
+        if author_id == user.pk:
             return Response(
                 {"errors": "Нельзя подписаться на самого себя!"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        exist = Subscription.objects.filter(
-            user=user, author=to_sub,
-        ).exists()
-
         if request.method == "POST":
-            if exist:
+            if subscriptions.subscribe(user, author_id):
+                author = User.objects.get(pk=author_id)
+                author.is_subscribed = True
+                serializer = SubscriptionSerializer(
+                    author, context={'request': request}
+                )
                 return Response(
-                    {"error": "Вы уже подписаны на этого пользователя!"},
-                    status=status.HTTP_400_BAD_REQUEST,
+                    serializer.data, status=status.HTTP_201_CREATED
                 )
+            key, error = "error", "Вы уже подписаны на этого пользователя!"
+        else:
+            if subscriptions.unsubscribe(user, author_id):
+                return Response(status=status.HTTP_204_NO_CONTENT)
+            key, error = "errors", "Вы уже отписаны от этого пользователя!"
 
-            serializer = SubscriptionCreateSerializer(
-                data={'user': user.id, 'author': to_sub.id},
-                context={'request': request},
-            )
-            serializer.is_valid(raise_exception=True)
-            serializer.save()
-
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        if not exist:
-            return Response(
-                {"errors": "Вы уже отписаны от этого пользователя!"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-        Subscription.objects.filter(
-            user=user, author=to_sub,
-        ).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        get_object_or_404(User.objects.only('id'), pk=author_id)
+        return Response({key: error}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(
         methods=['GET'],
@@ -112,8 +132,17 @@ class UserViewSet(djoser_views.UserViewSet):
     def subscriptions(self, request):
         """Функция для получения списка подписок."""
 
-        queryset = User.objects.filter(author__user=self.request.user)
+        queryset = User.objects.filter(
+            author__user=self.request.user
+        ).annotate(is_subscribed=Value(True))
         pages = self.paginate_queryset(queryset)
+
+        latest_recipes = get_latest_recipes(
+            [author.id for author in pages], get_recipes_limit(request)
+        )
+        for author in pages:
+            author.latest_recipes = latest_recipes[author.id]
+
         serializer = SubscriptionSerializer(
             pages, many=True, context={'request': request}
         )
@@ -1,7 +1,10 @@
 import os
 
-from django.core.asgi import get_asgi_application
+import django
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+django.setup(set_prefix=False)
 
-application = get_asgi_application()
+from api.asgi import FastPathASGIHandler  # noqa: E402
+
+application = FastPathASGIHandler()
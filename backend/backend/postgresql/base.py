@@ -0,0 +1,72 @@
+"""PostgreSQL с проверкой соединений и необязательным пулом.
+
+Постоянное соединение (CONN_MAX_AGE) перед первым запросом в новом
+HTTP-запросе проверяется, если включён CONN_HEALTH_CHECKS: иначе
+оборванное сервером соединение приводит к ошибке у клиента. При
+POOL_SIZE > 0 соединения берутся из общего пула процесса.
+"""
+import threading
+
+from django.db.backends.postgresql import base
+
+from .pool import ConnectionPool, record
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    health_check_done = False
+
+    def get_pool(self):
+        size = self.settings_dict.get('POOL_SIZE') or 0
+        if size <= 0:
+            return None
+        with pools_lock:
+            if self.alias not in pools:
+                pools[self.alias] = ConnectionPool(
+                    self.alias,
+                    max_size=size,
+                    timeout=self.settings_dict.get('POOL_TIMEOUT', 10),
+                    check_idle=self.settings_dict.get('POOL_CHECK_IDLE', 30),
+                )
+            return pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            connection = super().get_new_connection(conn_params)
+            record(self.alias, 'opens')
+            return connection
+        return pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            )
+        )
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            pool.release(self.connection)
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done:
+            self.health_check_done = True
+            if (
+                self.settings_dict.get('CONN_HEALTH_CHECKS')
+                and not self.in_atomic_block
+                and not self.is_usable()
+            ):
+                record(self.alias, 'errors')
+                self.close()
+            else:
+                record(self.alias, 'reuses')
+        super().ensure_connection()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
@@ -0,0 +1,138 @@
+"""Пул соединений с PostgreSQL внутри процесса.
+
+Нужен при потоковых воркерах gunicorn (--threads): соединение
+возвращается в пул в конце запроса и достаётся следующему потоку,
+вместо того чтобы каждый поток держал собственное. Соединение, которое
+простаивало дольше check_idle секунд, перед выдачей проверяется
+запросом SELECT 1.
+"""
+import threading
+import time
+from collections import deque
+
+from prometheus_client import Counter, Gauge
+from psycopg2 import OperationalError, extensions
+
+EVENTS = Counter(
+    'db_connection_events_total',
+    'События соединений с БД: opens, reuses, waits, timeouts, errors.',
+    ('alias', 'event'),
+)
+CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'Соединения пула по состоянию (idle, in_use).',
+    ('alias', 'state'),
+    multiprocess_mode='livesum',
+)
+
+
+class PoolTimeout(OperationalError):
+    """Свободное соединение не появилось за отведённое время."""
+
+
+def record(alias, event):
+    EVENTS.labels(alias, event).inc()
+
+
+class ConnectionPool:
+
+    def __init__(self, alias, max_size, timeout, check_idle):
+        self.alias = alias
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_idle = check_idle
+        self.size = 0
+        self.idle = deque()
+        self.condition = threading.Condition()
+
+    def update_gauges(self):
+        CONNECTIONS.labels(self.alias, 'idle').set(len(self.idle))
+        CONNECTIONS.labels(self.alias, 'in_use').set(
+            self.size - len(self.idle)
+        )
+
+    def acquire(self, connect):
+        """Соединение из пула или новое, созданное через connect()."""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self.condition:
+            while not self.idle and self.size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    record(self.alias, 'timeouts')
+                    raise PoolTimeout(
+                        f'Нет свободных соединений в пуле {self.alias} '
+                        f'за {self.timeout} с'
+                    )
+                if not waited:
+                    waited = True
+                    record(self.alias, 'waits')
+                self.condition.wait(remaining)
+
+            if self.idle:
+                connection, released_at = self.idle.pop()
+            else:
+                connection, released_at = None, None
+                self.size += 1
+            self.update_gauges()
+
+        if connection is not None:
+            if self.is_healthy(connection, released_at):
+                record(self.alias, 'reuses')
+                return connection
+            record(self.alias, 'errors')
+            self.close_quietly(connection)
+
+        try:
+            connection = connect()
+        except Exception:
+            record(self.alias, 'errors')
+            self.forget()
+            raise
+        record(self.alias, 'opens')
+        return connection
+
+    def is_healthy(self, connection, released_at):
+        if connection.closed:
+            return False
+        if time.monotonic() - released_at < self.check_idle:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except Exception:
+            return False
+        return True
+
+    def release(self, connection):
+        """Возвращает соединение в пул, откатив незавершённую транзакцию."""
+        try:
+            if not connection.closed and (
+                connection.info.transaction_status
+                != extensions.TRANSACTION_STATUS_IDLE
+            ):
+                connection.rollback()
+        except Exception:
+            record(self.alias, 'errors')
+            self.close_quietly(connection)
+        if connection.closed:
+            self.forget()
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.update_gauges()
+            self.condition.notify()
+
+    def forget(self):
+        """Освобождает место соединения, которое было закрыто."""
+        with self.condition:
+            self.size -= 1
+            self.update_gauges()
+            self.condition.notify()
+
+    @staticmethod
+    def close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -19,6 +19,7 @@ ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "127.0.0.1, localhost").split(", ")
 INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'recipes.apps.RecipesConfig',
+    'jobs.apps.JobsConfig',
     'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -33,6 +34,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.QueryInstrumentationMiddleware',
+    'api.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,18 +75,95 @@ if os.getenv("USE_SQLITE", False) == "TRUE":
     }
 
 else:
+    # При DB_POOL_SIZE > 0 соединения возвращаются в пул процесса в конце
+    # каждого запроса, иначе поток держит своё соединение CONN_MAX_AGE с.
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            'ENGINE': 'backend.postgresql',
             'NAME': os.getenv('POSTGRES_DB', 'django'),
             'USER': os.getenv('POSTGRES_USER', 'django'),
             'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
             'HOST': os.getenv('DB_HOST', ''),
-            'PORT': os.getenv('DB_PORT', 5432)
+            'PORT': os.getenv('DB_PORT', 5432),
+            'CONN_MAX_AGE': (
+                0 if DB_POOL_SIZE else int(os.getenv('DB_CONN_MAX_AGE', 60))
+            ),
+            'CONN_HEALTH_CHECKS': os.getenv(
+                'DB_CONN_HEALTH_CHECKS', 'TRUE'
+            ) == 'TRUE',
+            'POOL_SIZE': DB_POOL_SIZE,
+            'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
         }
     }
 
 
+# Версии кэшированных ответов должны видеть все процессы, поэтому в
+# продакшене нужен общий кэш (memcached из docker-compose); кэш в памяти
+# процесса подходит только для разработки (см. api.checks).
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            "CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv("CACHE_LOCATION", ''),
+    }
+}
+
+RECIPES_CACHE_TIMEOUT = int(os.getenv("RECIPES_CACHE_TIMEOUT", 60))
+
+# Как client_max_body_size в nginx: пакетная загрузка рецептов передаёт
+# изображения в теле запроса.
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(
+    os.getenv("DATA_UPLOAD_MAX_MEMORY_SIZE", 20 * 1024 * 1024)
+)
+
+JOBS_EAGER = os.getenv("JOBS_EAGER", False) == "TRUE"
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", 4))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", 1))
+
+
+METRICS_ALLOWED_IPS = os.getenv(
+    "METRICS_ALLOWED_IPS", "127.0.0.1, ::1"
+).split(", ")
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", False) == "TRUE"
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0.01))
+PROFILING_SLOW_MS = (
+    float(os.getenv("PROFILING_SLOW_MS"))
+    if os.getenv("PROFILING_SLOW_MS") else None
+)
+PROFILING_DIR = os.getenv("PROFILING_DIR", BASE_DIR / 'profiles')
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 500))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'request_metrics': {
+            'format': (
+                '%(asctime)s %(levelname)s %(message)s route=%(route)s '
+                'status=%(status)s db_queries=%(db_queries)s '
+                'db_time_ms=%(db_time_ms)s duration_ms=%(duration_ms)s'
+            ),
+        },
+    },
+    'handlers': {
+        'request_metrics': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'request_metrics',
+        },
+    },
+    'loggers': {
+        'api.instrumentation': {
+            'handlers': ['request_metrics'],
+            'level': os.getenv("REQUEST_LOG_LEVEL", 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -150,3 +230,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+SHOPPING_LIST_PDF_FONT = os.getenv(
+    "SHOPPING_LIST_PDF_FONT",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+)
@@ -0,0 +1,12 @@
+def warm_up():
+    """Заполняет кэши процесса при старте воркера."""
+    from django.db import DatabaseError
+
+    from api.recipes.tags import tag_list_data
+    from recipes.ingredient_index import ingredient_index
+
+    try:
+        ingredient_index.all()
+        tag_list_data.get()
+    except DatabaseError:
+        pass
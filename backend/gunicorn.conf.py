@@ -0,0 +1,27 @@
+"""Настройки gunicorn, загружаются автоматически из рабочего каталога."""
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+ASGI_MODE = os.environ.get('ASGI_MODE', 'FALSE') == 'TRUE'
+
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+if ASGI_MODE:
+    wsgi_app = 'backend.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'backend.wsgi:application'
+
+
+def on_starting(server):
+    """Очищает файлы метрик прошлого запуска."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(worker.pid)
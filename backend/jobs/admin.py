@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'task', 'queue', 'status', 'attempts', 'run_at', 'duration'
+    )
+    list_filter = ('status', 'queue', 'task')
+    search_fields = ('task',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'duration')
@@ -0,0 +1,13 @@
+MAX_TASK_LEN = 255
+MAX_QUEUE_LEN = 50
+MAX_WORKER_LEN = 100
+
+DEFAULT_QUEUE = 'default'
+DEFAULT_MAX_ATTEMPTS = 5
+
+RETRY_BACKOFF = 10  # seconds, doubles with every attempt
+RETRY_BACKOFF_MAX = 60 * 60  # seconds
+STALE_JOB_TIMEOUT = 30 * 60  # seconds
+JOB_RETENTION_DAYS = 7
+PRUNE_INTERVAL = 60 * 60  # seconds
+PRUNE_BATCH_SIZE = 1000
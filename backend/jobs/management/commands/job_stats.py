@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import get_stats
+
+
+class Command(BaseCommand):
+    help = "Статистика фоновых задач и длительности их выполнения"
+
+    def handle(self, *args, **options) -> str:
+        rows = get_stats()
+        for row in rows:
+            durations = ''
+            if row['avg_duration'] is not None:
+                durations = (
+                    f", avg: {row['avg_duration']:.3f} s, "
+                    f"max: {row['max_duration']:.3f} s"
+                )
+            self.stdout.write(
+                f"{row['task']} [{row['status']}]: {row['count']} jobs, "
+                f"{row['attempts']} attempts{durations}"
+            )
+        return "Задач нет" if not rows else ""
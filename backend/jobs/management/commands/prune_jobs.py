@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobs.constants import JOB_RETENTION_DAYS
+from jobs.queue import prune
+
+
+class Command(BaseCommand):
+    help = "Удаление выполненных и упавших фоновых задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=float,
+            default=JOB_RETENTION_DAYS,
+            metavar='DAYS',
+            help='Удалять задачи, завершённые больше DAYS дней назад.',
+        )
+
+    def handle(self, *args, **options) -> str:
+        return f"Удалено задач: {prune(options['older_than'])}"
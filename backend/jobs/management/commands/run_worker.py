@@ -0,0 +1,125 @@
+import logging
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections
+
+from jobs.constants import DEFAULT_QUEUE, JOB_RETENTION_DAYS, PRUNE_INTERVAL
+from jobs.queue import claim, execute, prune, requeue_stale
+
+logger = logging.getLogger(__name__)
+
+
+def run(job):
+    close_old_connections()
+    try:
+        return execute(job)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = "Обработчик фоновых задач"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', default=DEFAULT_QUEUE)
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.JOBS_CONCURRENCY,
+            help='Сколько задач выполнять одновременно.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.JOBS_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--prune-older-than',
+            type=float,
+            default=JOB_RETENTION_DAYS,
+            metavar='DAYS',
+            help='Раз в час удалять завершённые задачи старше DAYS дней; '
+                 '0 — не удалять.',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Завершиться, когда очередь опустеет.',
+        )
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def handle(self, *args, **options) -> str:
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        concurrency = max(options['concurrency'], 1)
+        processed = failed = 0
+        pending = set()
+        pruned_at = None
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while not self.stopping:
+                close_old_connections()
+                try:
+                    requeue_stale()
+                    if options['prune_older_than'] > 0 and (
+                        pruned_at is None
+                        or time.monotonic() - pruned_at >= PRUNE_INTERVAL
+                    ):
+                        prune(options['prune_older_than'])
+                        pruned_at = time.monotonic()
+                    jobs = claim(
+                        worker, options['queue'], concurrency - len(pending)
+                    ) if len(pending) < concurrency else []
+                except DatabaseError:
+                    # Соединение, на котором произошла ошибка,
+                    # закроет close_old_connections() в начале цикла.
+                    logger.exception('Ошибка базы данных в обработчике')
+                    jobs = []
+                    if not pending:
+                        time.sleep(options['poll_interval'])
+                        continue
+                pending.update(pool.submit(run, job) for job in jobs)
+
+                if not pending:
+                    if options['burst']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, pending = wait(
+                    pending,
+                    timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    try:
+                        job = future.result()
+                    except DatabaseError:
+                        # Результат не записан: задача останется в статусе
+                        # running, и её вернёт в очередь requeue_stale().
+                        logger.exception(
+                            'Не удалось записать результат задачи'
+                        )
+                        failed += 1
+                        continue
+                    processed += 1
+                    failed += job.status != job.DONE
+                    self.stdout.write(
+                        f'{job.task} #{job.pk}: {job.status}, '
+                        f'{job.duration:.3f} с'
+                    )
+            wait(pending)
+
+        return f"Обработано задач: {processed}, с ошибкой: {failed}"
@@ -0,0 +1,116 @@
+from django.db import models
+from django.utils import timezone
+
+from .constants import (DEFAULT_MAX_ATTEMPTS, DEFAULT_QUEUE, MAX_QUEUE_LEN,
+                        MAX_TASK_LEN, MAX_WORKER_LEN)
+
+
+class Job(models.Model):
+    """Отложенный вызов функции, который выполняет run_worker."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    queue = models.CharField(
+        max_length=MAX_QUEUE_LEN,
+        default=DEFAULT_QUEUE,
+        verbose_name="Очередь",
+    )
+
+    task = models.CharField(
+        max_length=MAX_TASK_LEN,
+        verbose_name="Функция",
+    )
+
+    args = models.JSONField(
+        default=list,
+        verbose_name="Позиционные аргументы",
+    )
+
+    kwargs = models.JSONField(
+        default=dict,
+        verbose_name="Именованные аргументы",
+    )
+
+    status = models.CharField(
+        max_length=max(len(status) for status, _ in STATUSES),
+        choices=STATUSES,
+        default=QUEUED,
+        verbose_name="Статус",
+    )
+
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Попыток",
+    )
+
+    max_attempts = models.PositiveSmallIntegerField(
+        default=DEFAULT_MAX_ATTEMPTS,
+        verbose_name="Максимум попыток",
+    )
+
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Запустить не раньше",
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Создана",
+    )
+
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Начало последней попытки",
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Окончание последней попытки",
+    )
+
+    duration = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name="Длительность, с",
+    )
+
+    worker = models.CharField(
+        max_length=MAX_WORKER_LEN,
+        blank=True,
+        verbose_name="Обработчик",
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        verbose_name="Последняя ошибка",
+    )
+
+    class Meta:
+        ordering = ('run_at', 'id')
+        verbose_name = "Задача"
+        verbose_name_plural = "Задачи"
+        indexes = [
+            models.Index(
+                fields=('queue', 'run_at', 'id'),
+                condition=models.Q(status='queued'),
+                name='job_queued_idx',
+            ),
+            models.Index(
+                fields=('status', 'started_at'),
+                name='job_status_started_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.task} [{self.status}]'
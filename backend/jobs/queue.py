@@ -0,0 +1,175 @@
+"""Очередь фоновых задач поверх основной базы данных.
+
+Задача — это путь к функции и её аргументы в JSON. Строка задачи
+создаётся в текущей транзакции, поэтому обработчик увидит её только
+после фиксации изменений, ради которых она поставлена.
+"""
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Avg, Count, F, Max, Sum
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .constants import (DEFAULT_MAX_ATTEMPTS, DEFAULT_QUEUE,
+                        JOB_RETENTION_DAYS, PRUNE_BATCH_SIZE, RETRY_BACKOFF,
+                        RETRY_BACKOFF_MAX, STALE_JOB_TIMEOUT)
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+def get_task_name(task):
+    if isinstance(task, str):
+        return task
+    return f'{task.__module__}.{task.__qualname__}'
+
+
+def enqueue(task, *args, queue=DEFAULT_QUEUE, delay=None,
+            max_attempts=DEFAULT_MAX_ATTEMPTS, **kwargs):
+    """Ставит вызов task(*args, **kwargs) в очередь.
+
+    task — функция уровня модуля или путь к ней, аргументы должны
+    сериализоваться в JSON. При JOBS_EAGER задача выполняется сразу
+    после фиксации транзакции, без записи в таблицу.
+    """
+    name = get_task_name(task)
+    if settings.JOBS_EAGER:
+        transaction.on_commit(lambda: run_eager(name, args, kwargs))
+        return None
+
+    run_at = timezone.now()
+    if delay:
+        run_at += timedelta(seconds=delay)
+    return Job.objects.create(
+        queue=queue,
+        task=name,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=max_attempts,
+        run_at=run_at,
+    )
+
+
+def run_eager(name, args, kwargs):
+    """Выполняет задачу сразу (JOBS_EAGER). Ошибка задачи, как и в
+    обработчике, только пишется в лог и не прерывает запрос, который
+    её поставил."""
+    try:
+        import_string(name)(*args, **kwargs)
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', name)
+
+
+def get_backoff(attempt):
+    """Задержка перед повтором: экспоненциальная, с верхней границей."""
+    return timedelta(
+        seconds=min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_BACKOFF_MAX)
+    )
+
+
+def claim(worker, queue=DEFAULT_QUEUE, limit=1):
+    """Забирает до limit готовых к запуску задач.
+
+    На PostgreSQL строки блокируются через SELECT ... FOR UPDATE SKIP
+    LOCKED, и параллельные обработчики не ждут друг друга. Где это
+    не поддерживается (SQLite), задача захватывается условным UPDATE:
+    строку получает тот, чей запрос первым сменил её статус.
+    """
+    now = timezone.now()
+    ready = Job.objects.filter(
+        queue=queue, status=Job.QUEUED, run_at__lte=now,
+    ).order_by('run_at', 'id')
+    running = {
+        'status': Job.RUNNING,
+        'worker': worker,
+        'started_at': now,
+        'attempts': F('attempts') + 1,
+    }
+
+    if connections[ready.db].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=ready.db):
+            ids = list(ready.select_for_update(
+                skip_locked=True
+            ).values_list('id', flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**running)
+    else:
+        ids = [
+            pk for pk in ready.values_list('id', flat=True)[:limit]
+            if Job.objects.filter(id=pk, status=Job.QUEUED).update(**running)
+        ]
+    return list(Job.objects.filter(id__in=ids).order_by('run_at', 'id'))
+
+
+def execute(job):
+    """Выполняет захваченную задачу и записывает результат попытки."""
+    started = time.monotonic()
+    result = {'last_error': ''}
+    try:
+        import_string(job.task)(*job.args, **job.kwargs)
+    except Exception:
+        logger.exception('Задача %s (%s) завершилась ошибкой',
+                         job.pk, job.task)
+        result['last_error'] = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            result['status'] = Job.QUEUED
+            result['run_at'] = timezone.now() + get_backoff(job.attempts)
+        else:
+            result['status'] = Job.FAILED
+    else:
+        result['status'] = Job.DONE
+
+    result['duration'] = time.monotonic() - started
+    result['finished_at'] = timezone.now()
+    Job.objects.filter(id=job.pk, worker=job.worker).update(**result)
+    for field, value in result.items():
+        setattr(job, field, value)
+    return job
+
+
+def requeue_stale(timeout=STALE_JOB_TIMEOUT):
+    """Возвращает в очередь задачи обработчиков, которые не завершились.
+
+    Считается, что такой обработчик аварийно остановился; его попытка
+    засчитывается как неудачная.
+    """
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, last_error='Обработчик не завершил задачу',
+    )
+    return failed + stale.update(status=Job.QUEUED, worker='')
+
+
+def prune(days=JOB_RETENTION_DAYS, batch_size=PRUNE_BATCH_SIZE):
+    """Удаляет выполненные и окончательно упавшие задачи, завершённые
+    больше days дней назад; возвращает их количество.
+
+    Удаление идёт пачками, чтобы не держать долгих блокировок.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    finished = Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED), finished_at__lt=cutoff,
+    ).order_by().values_list('id', flat=True)
+    deleted = 0
+    while True:
+        ids = list(finished[:batch_size])
+        if not ids:
+            return deleted
+        deleted += Job.objects.filter(id__in=ids).delete()[0]
+
+
+def get_stats():
+    """Количество задач и длительность выполнения по функциям и статусам."""
+    return Job.objects.values('task', 'status').annotate(
+        count=Count('id'),
+        attempts=Sum('attempts'),
+        avg_duration=Avg('duration'),
+        max_duration=Max('duration'),
+    ).order_by('task', 'status')
@@ -0,0 +1,296 @@
+"""Выгрузка и загрузка каталога рецептов в формате NDJSON.
+
+Каждая строка — рецепт с автором, тегами (slug), ингредиентами
+(название, единица измерения, количество) и путём к изображению.
+Выгрузка читает рецепты итератором и подгружает теги и ингредиенты
+отдельно для каждой порции. Загрузка пишет рецепты пачками, каждая в
+своей транзакции: рецепты получают новые id, а авторы, теги и
+ингредиенты сопоставляются по email, slug и названию. Память в обе
+стороны не зависит от размера каталога.
+"""
+import json
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Max, prefetch_related_objects
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import counters
+from .constants import (MAX_AMOUNT, MAX_COOKING_TIME, MIN_AMOUNT,
+                        MIN_COOKING_TIME)
+from .loaders import batched, insert_rows
+from .models import Ingredient, Recipe, RecipeIngredient, Tag, User
+from .renditions import generate_objects_renditions
+from jobs.queue import enqueue
+
+EXPORT_FIELDS = (
+    'name', 'text', 'cooking_time', 'pub_date', 'image', 'author',
+    'author__email', 'author__username',
+)
+RECIPE_COLUMNS = (
+    'id', 'author', 'name', 'text', 'cooking_time', 'image',
+    'rendered_image', 'pub_date', 'updated_at', 'favorites_count',
+)
+
+
+def dump_recipe(recipe):
+    return {
+        'id': recipe.pk,
+        'name': recipe.name,
+        'text': recipe.text,
+        'cooking_time': recipe.cooking_time,
+        'pub_date': recipe.pub_date.isoformat(),
+        'image': recipe.image.name,
+        'author': {
+            'id': recipe.author_id,
+            'email': recipe.author.email,
+            'username': recipe.author.username,
+        },
+        'tags': [tag.slug for tag in recipe.tags.all()],
+        'ingredients': [
+            {
+                'name': item.ingredient.name,
+                'measurement_unit': item.ingredient.measurement_unit,
+                'amount': item.amount,
+            }
+            for item in recipe.ingredient_list.all()
+        ],
+    }
+
+
+def export_recipes(file, chunk_size):
+    """Пишет рецепты в file по одному на строку; возвращает их количество."""
+    recipes = Recipe.objects.select_related('author').only(
+        *EXPORT_FIELDS
+    ).order_by('pk').iterator(chunk_size=chunk_size)
+    count = 0
+    for chunk in batched(recipes, chunk_size):
+        prefetch_related_objects(
+            chunk, 'tags', 'ingredient_list__ingredient'
+        )
+        file.writelines(
+            json.dumps(dump_recipe(recipe), ensure_ascii=False) + '\n'
+            for recipe in chunk
+        )
+        count += len(chunk)
+    return count
+
+
+def read_lines(file):
+    """Непустые строки выгрузки (bytes) с номерами.
+
+    Строки разбираются в CatalogImporter.resolve, поэтому испорченная
+    строка становится ошибкой своей записи, а не всей загрузки.
+    """
+    for line, text in enumerate(file, start=1):
+        if text.strip():
+            yield line, text
+
+
+def load_record(text):
+    try:
+        return json.loads(text)
+    except ValueError as error:
+        raise ValueError(f'Неверный JSON: {error}.')
+
+
+def check_length(value, model, field):
+    max_length = model._meta.get_field(field).max_length
+    if len(value) > max_length:
+        raise ValueError(
+            f'{model._meta.model_name}.{field} длиннее {max_length} '
+            f'символов.'
+        )
+
+
+def parse_recipe(item):
+    """Поля рецепта из записи выгрузки; ValueError, если запись неверна."""
+    try:
+        recipe = {
+            'source_id': item.get('id'),
+            'name': str(item['name']).strip(),
+            'text': str(item['text']),
+            'cooking_time': int(item['cooking_time']),
+            'image': str(item['image']),
+            'pub_date': parse_datetime(item.get('pub_date') or ''),
+            'email': str(item['author']['email']),
+            'tags': list(dict.fromkeys(str(slug) for slug in item['tags'])),
+            'ingredients': [
+                (
+                    str(ingredient['name']),
+                    str(ingredient['measurement_unit']),
+                    int(ingredient['amount']),
+                )
+                for ingredient in item['ingredients']
+            ],
+        }
+    except KeyError as error:
+        raise ValueError(f'Нет поля {error}.')
+    except (AttributeError, TypeError, ValueError) as error:
+        raise ValueError(f'Неверный формат записи: {error}.')
+
+    if not recipe['name'] or not recipe['image']:
+        raise ValueError('Не заполнено название или изображение.')
+    for field in ('name', 'text', 'image'):
+        check_length(recipe[field], Recipe, field)
+    for name, unit, _ in recipe['ingredients']:
+        check_length(name, Ingredient, 'name')
+        check_length(unit, Ingredient, 'measurement_unit')
+    if not MIN_COOKING_TIME <= recipe['cooking_time'] <= MAX_COOKING_TIME:
+        raise ValueError('Недопустимое время приготовления.')
+    if not recipe['tags'] or not recipe['ingredients']:
+        raise ValueError('Нужен хотя бы один тег и один ингредиент.')
+    keys = [(name, unit) for name, unit, _ in recipe['ingredients']]
+    if len(set(keys)) != len(keys):
+        raise ValueError('Ингредиенты повторяются.')
+    if any(
+        not MIN_AMOUNT <= amount <= MAX_AMOUNT
+        for _, _, amount in recipe['ingredients']
+    ):
+        raise ValueError('Недопустимое количество ингредиента.')
+    if recipe['pub_date'] is not None and timezone.is_naive(
+        recipe['pub_date']
+    ):
+        recipe['pub_date'] = timezone.make_aware(recipe['pub_date'])
+    return recipe
+
+
+def lookup(ids, key, label):
+    try:
+        return ids[key]
+    except KeyError:
+        raise ValueError(f'{label} {key} не найден.')
+
+
+def allocate_ids(model, count):
+    """Новые id для count строк model."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [model._meta.db_table, count],
+            )
+            return sorted(pk for pk, in cursor.fetchall())
+    # В SQLite запись сериализована, а AUTOINCREMENT учитывает явно
+    # вставленные id, так что следующие за максимальным свободны.
+    first = (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+    return list(range(first, first + count))
+
+
+class CatalogImporter:
+    """Загрузка рецептов из записей выгрузки export_recipes.
+
+    Автор без учётной записи с тем же email заменяется на
+    default_author, если он задан.
+    """
+
+    def __init__(self, default_author=None):
+        self.default_author = default_author
+        self.tag_ids = dict(Tag.objects.values_list('slug', 'id'))
+
+    def get_author_ids(self, emails):
+        author_ids = dict(
+            User.objects.filter(email__in=emails).values_list('email', 'id')
+        )
+        if self.default_author is not None:
+            for email in emails:
+                author_ids.setdefault(email, self.default_author.pk)
+        return author_ids
+
+    def get_ingredient_ids(self, names):
+        names = sorted(names)
+        ingredient_ids = {}
+        for chunk in batched(
+            names, connection.ops.bulk_batch_size(['name'], names)
+        ):
+            ingredient_ids.update(
+                ((name, unit), pk)
+                for name, unit, pk in Ingredient.objects.filter(
+                    name__in=chunk
+                ).values_list('name', 'measurement_unit', 'id')
+            )
+        return ingredient_ids
+
+    def resolve(self, batch):
+        """Проверяет строки пачки [(номер, строка)] из read_lines.
+
+        Возвращает рецепты с id связанных объектов и ошибки
+        [(номер, текст)].
+        """
+        recipes, errors = [], []
+        for line, text in batch:
+            try:
+                recipe = parse_recipe(load_record(text))
+            except ValueError as error:
+                errors.append((line, str(error)))
+                continue
+            recipe['line'] = line
+            recipes.append(recipe)
+
+        author_ids = self.get_author_ids({
+            recipe['email'] for recipe in recipes
+        })
+        ingredient_ids = self.get_ingredient_ids({
+            name for recipe in recipes
+            for name, _, _ in recipe['ingredients']
+        })
+        resolved = []
+        for recipe in recipes:
+            try:
+                recipe['author'] = lookup(
+                    author_ids, recipe['email'], 'Автор'
+                )
+                recipe['tags'] = [
+                    lookup(self.tag_ids, slug, 'Тег')
+                    for slug in recipe['tags']
+                ]
+                recipe['ingredients'] = [
+                    (
+                        lookup(ingredient_ids, (name, unit), 'Ингредиент'),
+                        amount,
+                    )
+                    for name, unit, amount in recipe['ingredients']
+                ]
+            except ValueError as error:
+                errors.append((recipe['line'], str(error)))
+                continue
+            resolved.append(recipe)
+        return resolved, sorted(errors)
+
+    @transaction.atomic
+    def save(self, recipes):
+        """Записывает пачку проверенных рецептов; возвращает их новые id.
+
+        Строки вставляются без ORM (на PostgreSQL через COPY), поэтому
+        счётчик рецептов авторов и задачи на варианты изображений
+        обновляются здесь.
+        """
+        ids = allocate_ids(Recipe, len(recipes))
+        now = timezone.now()
+        adapt = connection.ops.adapt_datetimefield_value
+        insert_rows(Recipe, RECIPE_COLUMNS, [
+            (
+                pk, recipe['author'], recipe['name'], recipe['text'],
+                recipe['cooking_time'], recipe['image'], '',
+                adapt(recipe['pub_date'] or now), adapt(now), 0,
+            )
+            for pk, recipe in zip(ids, recipes)
+        ])
+        insert_rows(RecipeIngredient, ('recipe', 'ingredient', 'amount'), [
+            (pk, ingredient_id, amount)
+            for pk, recipe in zip(ids, recipes)
+            for ingredient_id, amount in recipe['ingredients']
+        ])
+        insert_rows(Recipe.tags.through, ('recipe', 'tag'), [
+            (pk, tag_id)
+            for pk, recipe in zip(ids, recipes)
+            for tag_id in recipe['tags']
+        ])
+        counters.increment_each(
+            User, Counter(recipe['author'] for recipe in recipes),
+            'recipes_count',
+        )
+        enqueue(generate_objects_renditions, 'recipes.Recipe', ids, 'image')
+        return ids
@@ -7,3 +7,31 @@ MAX_AMOUNT = 100_000
 
 MIN_COOKING_TIME = 1
 MAX_COOKING_TIME = 1440 * 7  # 7 days
+
+INGREDIENT_INDEX_TTL = 5 * 60  # seconds
+INGREDIENT_INDEX_CHECK_INTERVAL = 1  # seconds
+
+SEARCH_CONFIG = 'russian'
+
+SHORT_LINK_ALPHABET = (
+    '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+)
+SHORT_LINK_LENGTH = 6
+SHORT_LINK_LEGACY_BASE = 16
+SHORT_LINK_CACHE_SIZE = 10_000
+SHORT_LINK_CACHE_TTL = 5 * 60  # seconds
+SHORT_LINK_FLUSH_INTERVAL = 10  # seconds
+SHORT_LINK_FLUSH_SIZE = 1000
+
+LOAD_BATCH_SIZE = 5000
+LOAD_READ_SIZE = 64 * 1024  # characters
+CATALOG_CHUNK_SIZE = 1000
+
+IMAGE_RENDITIONS = {
+    'thumbnail': {'size': (480, 480), 'format': 'JPEG', 'crop': True},
+    'thumbnail_webp': {'size': (480, 480), 'format': 'WEBP', 'crop': True},
+    'webp': {'size': (1600, 1600), 'format': 'WEBP', 'crop': False},
+}
+IMAGE_RENDITION_QUALITY = 80
+IMAGE_RENDITIONS_DIR = 'renditions'
+MAX_IMAGE_NAME_LEN = 100  # как у ImageField по умолчанию
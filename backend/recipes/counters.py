@@ -0,0 +1,88 @@
+"""Денормализованные счётчики рецептов, избранного и подписчиков.
+
+Счётчики входят в ответы API, поэтому их изменение обновляет updated_at.
+"""
+from django.apps import apps as global_apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import (Case, Count, F, OuterRef, PositiveIntegerField,
+                              Subquery, Value, When)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def increment(model, pk, field, amount=1):
+    model.objects.filter(pk=pk).update(
+        **{field: F(field) + amount}, updated_at=timezone.now()
+    )
+
+
+def decrement(model, pk, field):
+    model.objects.filter(pk=pk, **{f'{field}__gt': 0}).update(
+        **{field: F(field) - 1}, updated_at=timezone.now()
+    )
+
+
+def increment_many(model, pks, field):
+    model.objects.filter(pk__in=pks).update(
+        **{field: F(field) + 1}, updated_at=timezone.now()
+    )
+
+
+def decrement_many(model, pks, field):
+    model.objects.filter(pk__in=pks, **{f'{field}__gt': 0}).update(
+        **{field: F(field) - 1}, updated_at=timezone.now()
+    )
+
+
+def increment_each(model, amounts, field):
+    """Прибавляет к счётчику каждого объекта своё значение: {pk: amount}."""
+    if not amounts:
+        return
+    model.objects.filter(pk__in=amounts).update(
+        **{field: F(field) + Case(
+            *(
+                When(pk=pk, then=Value(amount))
+                for pk, amount in amounts.items()
+            ),
+            output_field=PositiveIntegerField(),
+        )},
+        updated_at=timezone.now(),
+    )
+
+
+def count_by(model, field):
+    """Подзапрос с количеством строк model, ссылающихся на внешний объект."""
+    return Coalesce(Subquery(
+        model.objects.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+def touch(model):
+    """updated_at для update(); в ранних миграциях этого поля ещё нет."""
+    try:
+        model._meta.get_field('updated_at')
+    except FieldDoesNotExist:
+        return {}
+    return {'updated_at': timezone.now()}
+
+
+def recalculate_counters(apps=global_apps):
+    """Пересчитывает все счётчики по фактическим данным."""
+    user_model = apps.get_model('users', 'User')
+    recipe_model = apps.get_model('recipes', 'Recipe')
+    favorite_model = apps.get_model('recipes', 'Favorite')
+    subscription_model = apps.get_model('users', 'Subscription')
+
+    user_model.objects.update(
+        recipes_count=count_by(recipe_model, 'author'),
+        subscribers_count=count_by(subscription_model, 'author'),
+        **touch(user_model),
+    )
+    recipe_model.objects.update(
+        favorites_count=count_by(favorite_model, 'recipe'),
+        **touch(recipe_model),
+    )
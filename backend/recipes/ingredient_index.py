@@ -0,0 +1,141 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .constants import INGREDIENT_INDEX_CHECK_INTERVAL, INGREDIENT_INDEX_TTL
+from .models import Ingredient
+
+VERSION_CACHE_KEY = 'ingredient_index_version'
+NGRAM_SIZE = 3
+
+
+class _Snapshot:
+    """Неизменяемый снимок таблицы ингредиентов.
+
+    Меняется только checked_at — время последней сверки версии.
+    """
+
+    def __init__(self, rows, version):
+        self.rows = rows
+        self.ids = frozenset(ingredient.pk for ingredient in rows)
+        self.version = version
+        self.built_at = self.checked_at = time.monotonic()
+        self.names = [ingredient.name.casefold() for ingredient in rows]
+        self.prefixes = sorted(
+            (name, position) for position, name in enumerate(self.names)
+        )
+        ngrams = defaultdict(set)
+        for position, name in enumerate(self.names):
+            for i in range(len(name) - NGRAM_SIZE + 1):
+                ngrams[name[i:i + NGRAM_SIZE]].add(position)
+        self.ngrams = dict(ngrams)
+
+    def is_fresh(self, version):
+        return (
+            self.version == version
+            and time.monotonic() - self.built_at < INGREDIENT_INDEX_TTL
+        )
+
+    def search(self, value, limit=None):
+        value = value.casefold()
+        positions = self.search_prefix(value)
+        if not positions:
+            positions = self.search_substring(value)
+
+        return [self.rows[position] for position in sorted(positions)][:limit]
+
+    def search_prefix(self, value):
+        positions = []
+        start = bisect_left(self.prefixes, (value,))
+        for name, position in self.prefixes[start:]:
+            if not name.startswith(value):
+                break
+            positions.append(position)
+        return positions
+
+    def search_substring(self, value):
+        if len(value) < NGRAM_SIZE:
+            candidates = range(len(self.rows))
+        else:
+            postings = sorted(
+                (
+                    self.ngrams.get(value[i:i + NGRAM_SIZE], ())
+                    for i in range(len(value) - NGRAM_SIZE + 1)
+                ),
+                key=len,
+            )
+            candidates = set(postings[0]).intersection(*postings[1:])
+
+        return [
+            position for position in candidates
+            if value in self.names[position]
+        ]
+
+
+class IngredientIndex:
+    """Индекс ингредиентов в памяти процесса для автодополнения.
+
+    Повторяет поведение IngredientFilter: сначала ищет по началу названия,
+    а если совпадений нет — по вхождению подстроки, без учёта регистра.
+    Результаты возвращаются в порядке id, как и из базы.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def invalidate(self):
+        """Сбрасывает индекс во всех процессах, разделяющих кэш.
+
+        Версия меняется после фиксации транзакции: иначе другой процесс
+        успел бы перестроить индекс по старым данным и хранить его до
+        следующего изменения.
+        """
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self):
+        self._snapshot = None
+        try:
+            cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.set(VERSION_CACHE_KEY, 1, None)
+
+    def all(self):
+        return list(self.get_snapshot().rows)
+
+    def search(self, value, limit=None):
+        return self.get_snapshot().search(value, limit)
+
+    def current(self):
+        """Снимок без обращения к кэшу и базе или None, если пора сверить
+        версию. Подходит для асинхронного кода."""
+        snapshot = self._snapshot
+        if snapshot is not None and (
+            time.monotonic() - snapshot.checked_at
+            < INGREDIENT_INDEX_CHECK_INTERVAL
+        ):
+            return snapshot
+        return None
+
+    def get_snapshot(self):
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.is_fresh(version):
+            snapshot.checked_at = time.monotonic()
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or not snapshot.is_fresh(version):
+                snapshot = _Snapshot(
+                    list(Ingredient.objects.order_by('id')), version
+                )
+                self._snapshot = snapshot
+            return snapshot
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,323 @@
+"""Потоковая загрузка справочников (ингредиенты, теги) из CSV и JSON.
+
+Файл читается по частям, строки пишутся пачками через
+INSERT ... ON CONFLICT, поэтому повторная загрузка того же файла ничего
+не дублирует. На PostgreSQL пачки передаются через COPY во временную
+таблицу, откуда переносятся одним INSERT ... SELECT.
+"""
+import csv
+import io
+import json
+import os
+import re
+import time
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from .constants import LOAD_BATCH_SIZE, LOAD_READ_SIZE
+
+JSON_SEPARATORS = re.compile(r'[\s\[\],]*')
+
+
+def read_csv(file, fields):
+    """Строки CSV без заголовка (или с заголовком из имён полей)."""
+    for line, row in enumerate(csv.reader(file), start=1):
+        if not row or (line == 1 and tuple(row) == tuple(fields)):
+            continue
+        yield line, dict(zip(fields, row))
+
+
+def read_json(file, fields=None):
+    """Объекты JSON-массива или JSON Lines без чтения файла целиком.
+
+    Если fields не заданы, объекты возвращаются целиком.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, line = '', 0, 0
+    while True:
+        chunk = file.read(LOAD_READ_SIZE)
+        buffer = buffer[position:] + chunk
+        position = 0
+        while True:
+            position = JSON_SEPARATORS.match(buffer, position).end()
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if not chunk:
+                    if position < len(buffer):
+                        raise
+                    return
+                break
+            line += 1
+            position = end
+            if fields is not None:
+                item = {field: item.get(field) for field in fields}
+            yield line, item
+
+
+def read_rows(path, fields, file_format=None):
+    """Нормализованные строки файла: (номер записи, словарь полей)."""
+    file_format = file_format or os.path.splitext(path)[1].lstrip('.')
+    reader = {'csv': read_csv, 'json': read_json, 'jsonl': read_json}.get(
+        file_format.lower()
+    )
+    if reader is None:
+        raise ValueError(f'Неизвестный формат файла: {file_format}')
+
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        for line, row in reader(file, fields):
+            values = {
+                field: str(value).strip() if value is not None else ''
+                for field, value in row.items()
+            }
+            missing = [field for field, value in values.items() if not value]
+            if missing:
+                raise ValueError(
+                    f'Запись {line}: не заполнены поля {", ".join(missing)}'
+                )
+            yield line, values
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def copy_rows(table, columns, rows):
+    """Передаёт строки в таблицу PostgreSQL через COPY ... FROM STDIN."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {table} ({", ".join(columns)}) FROM STDIN WITH CSV',
+            buffer,
+        )
+
+
+def insert_rows(model, fields, rows):
+    """Вставляет кортежи значений полей fields, не создавая объекты.
+
+    Значения должны быть уже приведены к виду для базы данных.
+    """
+    table = model._meta.db_table
+    columns = [model._meta.get_field(field).column for field in fields]
+    if connection.vendor == 'postgresql':
+        copy_rows(table, columns, rows)
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})',
+            rows,
+        )
+
+
+class CatalogLoader:
+    """Загрузчик справочника с уникальным ключом key_fields.
+
+    Поля вне ключа обновляются у существующих строк; если все поля
+    входят в ключ, существующие строки пропускаются.
+    """
+
+    def __init__(self, model, fields, key_fields):
+        self.model = model
+        self.fields = tuple(fields)
+        self.key_fields = tuple(key_fields)
+        self.update_fields = tuple(
+            field for field in self.fields if field not in self.key_fields
+        )
+        self.table = model._meta.db_table
+        self.columns = tuple(
+            model._meta.get_field(field).column for field in self.fields
+        )
+        self.use_copy = connection.vendor == 'postgresql'
+        self.staging_table = f'{self.table}_load'
+
+    def get_key(self, row):
+        return tuple(row[field] for field in self.key_fields)
+
+    def deduplicate(self, batch):
+        """Последняя запись с каждым ключом: ON CONFLICT не допускает
+        повторного изменения одной строки в одном запросе."""
+        return list({self.get_key(row): row for row in batch}.values())
+
+    def get_conflict_sql(self):
+        key_columns = ', '.join(
+            self.model._meta.get_field(field).column
+            for field in self.key_fields
+        )
+        if not self.update_fields:
+            return f'ON CONFLICT ({key_columns}) DO NOTHING'
+        assignments = ', '.join(
+            f'{column} = excluded.{column}'
+            for field, column in zip(self.fields, self.columns)
+            if field in self.update_fields
+        )
+        return f'ON CONFLICT ({key_columns}) DO UPDATE SET {assignments}'
+
+    def count(self):
+        return self.model.objects.count()
+
+    def start(self):
+        if self.use_copy:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'CREATE TEMP TABLE {self.staging_table} '
+                    f'ON COMMIT DROP AS '
+                    f'SELECT {", ".join(self.columns)} FROM {self.table} '
+                    f'WITH NO DATA'
+                )
+
+    def write(self, batch):
+        """Записывает пачку строк (внутри транзакции загрузки)."""
+        if self.use_copy:
+            copy_rows(self.staging_table, self.columns, (
+                [row[field] for field in self.fields] for row in batch
+            ))
+            return
+
+        batch = self.deduplicate(batch)
+        size = connection.ops.bulk_batch_size(self.columns, batch)
+        row_sql = f'({", ".join(["%s"] * len(self.columns))})'
+        with connection.cursor() as cursor:
+            for rows in batched(batch, size):
+                cursor.execute(
+                    f'INSERT INTO {self.table} ({", ".join(self.columns)}) '
+                    f'VALUES {", ".join([row_sql] * len(rows))} '
+                    f'{self.get_conflict_sql()}',
+                    [row[field] for row in rows for field in self.fields],
+                )
+
+    def finish(self):
+        if self.use_copy:
+            key_columns = ', '.join(
+                self.model._meta.get_field(field).column
+                for field in self.key_fields
+            )
+            columns = ', '.join(self.columns)
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {self.table} ({columns}) '
+                    f'SELECT DISTINCT ON ({key_columns}) {columns} '
+                    f'FROM {self.staging_table} '
+                    f'{self.get_conflict_sql()}'
+                )
+
+    def diff(self, batch):
+        """Сравнивает пачку с таблицей.
+
+        Возвращает новые строки, пары (текущая, новая) для изменённых
+        и количество строк без изменений.
+        """
+        batch = self.deduplicate(batch)
+        first_key = self.key_fields[0]
+        existing = {}
+        for rows in batched(
+            batch, connection.ops.bulk_batch_size([first_key], batch)
+        ):
+            existing.update(
+                (tuple(values[field] for field in self.key_fields), values)
+                for values in self.model.objects.filter(**{
+                    f'{first_key}__in': {row[first_key] for row in rows}
+                }).values(*self.fields)
+            )
+        created, changed = [], []
+        for row in batch:
+            current = existing.get(self.get_key(row))
+            if current is None:
+                created.append(row)
+            elif any(
+                current[field] != row[field] for field in self.update_fields
+            ):
+                changed.append((current, row))
+        return created, changed, len(batch) - len(created) - len(changed)
+
+
+class LoadCatalogCommand(BaseCommand):
+    """Общая часть команд загрузки справочников."""
+
+    model = None
+    fields = ()
+    key_fields = ()
+    default_path = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=self.default_path)
+        parser.add_argument(
+            '--format',
+            choices=('csv', 'json', 'jsonl'),
+            help='Формат файла (по умолчанию — по расширению).',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=LOAD_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что изменится, не записывая в БД.',
+        )
+
+    def after_load(self):
+        """Сбрасывает кэши, зависящие от справочника."""
+
+    def handle(self, *args, **options) -> str:
+        loader = CatalogLoader(self.model, self.fields, self.key_fields)
+        rows = (
+            row for _, row in read_rows(
+                options['path'], self.fields, options['format']
+            )
+        )
+        started = time.monotonic()
+        processed = created = changed = unchanged = 0
+        before = loader.count()
+
+        try:
+            with transaction.atomic():
+                if not options['dry_run']:
+                    loader.start()
+                for batch in batched(rows, options['batch_size']):
+                    if options['dry_run']:
+                        new, updated, same = loader.diff(batch)
+                        created += len(new)
+                        changed += len(updated)
+                        unchanged += same
+                        if options['verbosity'] > 1:
+                            for row in new:
+                                self.stdout.write(f'+ {row}')
+                            for current, row in updated:
+                                self.stdout.write(f'~ {current} -> {row}')
+                    else:
+                        loader.write(batch)
+                    processed += len(batch)
+                    self.report(processed, started)
+                if not options['dry_run']:
+                    loader.finish()
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.stderr.write('')
+
+        if options['dry_run']:
+            return (
+                f"Будет добавлено: {created}, изменено: {changed}, "
+                f"без изменений: {unchanged}"
+            )
+        self.after_load()
+        return (
+            f"Обработано записей: {processed}, "
+            f"добавлено: {loader.count() - before}, "
+            f"{processed / max(time.monotonic() - started, 1e-6):.0f} строк/с"
+        )
+
+    def report(self, processed, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stderr.write(
+            f'{processed} записей, {processed / elapsed:.0f} строк/с',
+            ending='\r',
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from recipes.catalog import export_recipes
+from recipes.constants import CATALOG_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Потоковая выгрузка каталога рецептов в NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки; "-" — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CATALOG_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options) -> str:
+        if options['path'] == '-':
+            count = export_recipes(self.stdout, options['chunk_size'])
+            # Стандартный вывод занят выгрузкой.
+            self.stderr.write(f"Выгружено рецептов: {count}")
+            return ''
+
+        with open(options['path'], 'w', encoding='utf-8') as file:
+            count = export_recipes(file, options['chunk_size'])
+        return f"Выгружено рецептов: {count}"
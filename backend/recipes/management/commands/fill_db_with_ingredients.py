@@ -1,21 +1,15 @@
-import json
-from typing import Any
-
-from django.core.management.base import BaseCommand
-
+from recipes.ingredient_index import ingredient_index
+from recipes.loaders import LoadCatalogCommand
 from recipes.models import Ingredient
 
 
-class Command(BaseCommand):
-    help = "Заполнение бд ингредиентами"
-
-    def handle(self, *args: Any, **options: Any) -> str:
-        path = "data/ingredients.json"
+class Command(LoadCatalogCommand):
+    help = "Заполнение бд ингредиентами из CSV или JSON"
 
-        with open(path, 'r', encoding="utf-8") as file:
-            text = file.read()
+    model = Ingredient
+    fields = ('name', 'measurement_unit')
+    key_fields = ('name', 'measurement_unit')
+    default_path = "data/ingredients.json"
 
-        ingridients = json.loads(text)
-        objects = [Ingredient(**ingridient) for ingridient in ingridients]
-        Ingredient.objects.bulk_create(objects)
-        return "Created successfully"
+    def after_load(self):
+        ingredient_index.invalidate()
@@ -1,20 +1,15 @@
-import json
-
-from django.core.management.base import BaseCommand
-
+from api.recipes import cache
+from recipes.loaders import LoadCatalogCommand
 from recipes.models import Tag
 
 
-class Command(BaseCommand):
-    help = "Заполнение бд тегами"
-
-    def handle(self, *args, **options) -> str:
-        path = "data/tags.json"
+class Command(LoadCatalogCommand):
+    help = "Заполнение бд тегами из CSV или JSON"
 
-        with open(path, 'r', encoding="utf-8") as file:
-            text = file.read()
+    model = Tag
+    fields = ('name', 'slug')
+    key_fields = ('slug',)
+    default_path = "data/tags.json"
 
-        ingridients = json.loads(text)
-        objects = [Tag(**ingridient) for ingridient in ingridients]
-        Tag.objects.bulk_create(objects)
-        return "Created successfully"
+    def after_load(self):
+        cache.invalidate(cache.LIST, cache.TAGS)
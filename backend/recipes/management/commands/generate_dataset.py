@@ -0,0 +1,295 @@
+import random
+import time
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from PIL import Image
+
+from api.recipes import cache
+from recipes import shopping_list
+from recipes.constants import (LOAD_BATCH_SIZE, MAX_AMOUNT, MAX_COOKING_TIME,
+                               MIN_AMOUNT)
+from recipes.counters import recalculate_counters
+from recipes.ingredient_index import ingredient_index
+from recipes.loaders import batched, insert_rows
+from recipes.models import (Favorite, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+from recipes.renditions import generate_renditions, has_renditions
+from users.models import Subscription, User
+
+DATASET_IMAGE = 'recipes/dataset.jpg'
+DATASET_PASSWORD = 'dataset-password'
+DATASET_PERIOD = timedelta(days=365)
+
+ADJECTIVES = (
+    'домашний', 'быстрый', 'пряный', 'сырный', 'летний', 'осенний',
+    'острый', 'сладкий', 'лёгкий', 'сытный', 'овощной', 'грибной',
+)
+DISHES = (
+    'суп', 'салат', 'пирог', 'омлет', 'плов', 'рагу', 'соус', 'десерт',
+    'борщ', 'гуляш', 'пудинг', 'ризотто', 'гратен', 'хлеб', 'паштет',
+)
+WORDS = (
+    'нарезать', 'обжарить', 'добавить', 'перемешать', 'запекать',
+    'посолить', 'поперчить', 'варить', 'остудить', 'подавать', 'тесто',
+    'сковорода', 'духовка', 'минут', 'до', 'готовности', 'с', 'и',
+)
+
+
+def zipf_weights(size, skew):
+    """Накопленные веса распределения Ципфа для ранга 1..size."""
+    return list(accumulate(1 / rank ** skew for rank in range(1, size + 1)))
+
+
+class Command(BaseCommand):
+    help = "Генерация синтетических данных для нагрузочного тестирования"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--authors', type=float, default=0.2,
+            help='Доля пользователей, публикующих рецепты.',
+        )
+        parser.add_argument('--recipes', type=int, default=5000)
+        parser.add_argument(
+            '--skew', type=float, default=1.1,
+            help='Показатель степенного распределения рецептов по авторам '
+                 'и популярности рецептов.',
+        )
+        parser.add_argument('--ingredients', type=int, default=2000)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=8)
+        parser.add_argument('--tags', type=int, default=8)
+        parser.add_argument('--tags-per-recipe', type=int, default=2)
+        parser.add_argument(
+            '--favorites', type=float, default=10,
+            help='Среднее число рецептов в избранном у пользователя.',
+        )
+        parser.add_argument('--carts', type=float, default=2)
+        parser.add_argument('--subscriptions', type=float, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=LOAD_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options) -> str:
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        self.now = timezone.now()
+        self.started = time.monotonic()
+
+        with transaction.atomic():
+            tags = self.ensure_tags()
+            ingredients = self.ensure_ingredients()
+            users = self.create_users()
+            authors = users[:max(1, int(len(users) * options['authors']))]
+            recipes = self.create_recipes(authors)
+            self.create_recipe_ingredients(recipes, ingredients)
+            self.create_recipe_tags(recipes, tags)
+            recipe_weights = zipf_weights(len(recipes), options['skew'])
+            self.create_links(
+                Favorite, users, recipes, recipe_weights,
+                options['favorites'],
+            )
+            self.create_links(
+                ShoppingCart, users, recipes, recipe_weights,
+                options['carts'],
+            )
+            self.create_subscriptions(users, authors)
+
+            self.log('Пересчёт счётчиков и списков покупок')
+            recalculate_counters()
+            shopping_list.rebuild()
+            self.reset_sequences(User, Recipe)
+
+        ingredient_index.invalidate()
+        cache.invalidate(cache.LIST, cache.TAGS)
+        return (
+            f"Создано пользователей: {len(users)}, рецептов: {len(recipes)} "
+            f"за {time.monotonic() - self.started:.1f} с"
+        )
+
+    def log(self, message):
+        self.stdout.write(
+            f'[{time.monotonic() - self.started:7.1f} с] {message}'
+        )
+
+    def insert(self, model, fields, rows):
+        """Вставляет кортежи значений пачками в обход ORM."""
+        count = 0
+        for batch in batched(rows, self.options['batch_size']):
+            insert_rows(model, fields, batch)
+            count += len(batch)
+        self.log(f'{model._meta.label}: {count}')
+        return count
+
+    def create_missing(self, model, objects):
+        """Справочники небольшие: создаются через ORM, дубли пропускаются."""
+        model.objects.bulk_create(
+            objects, batch_size=self.options['batch_size'],
+            ignore_conflicts=True,
+        )
+        return list(model.objects.values_list('id', flat=True))
+
+    def adapt(self, value):
+        return connection.ops.adapt_datetimefield_value(value)
+
+    def get_next_id(self, model):
+        return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+    def reset_sequences(self, *models):
+        """Сдвигает последовательности после вставки с явными id."""
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)
+
+    def ensure_tags(self):
+        existing = Tag.objects.count()
+        return self.create_missing(Tag, [
+            Tag(name=f'Тег {number}', slug=f'tag-{number}')
+            for number in range(existing + 1, self.options['tags'] + 1)
+        ])
+
+    def ensure_ingredients(self):
+        existing = Ingredient.objects.count()
+        return self.create_missing(Ingredient, [
+            Ingredient(
+                name=f'ингредиент {number}',
+                measurement_unit=self.rng.choice(('г', 'мл', 'шт')),
+            )
+            for number in range(
+                existing + 1, self.options['ingredients'] + 1
+            )
+        ])
+
+    def create_users(self):
+        first_id = self.get_next_id(User)
+        ids = list(range(first_id, first_id + self.options['users']))
+        password = make_password(DATASET_PASSWORD)
+        now = self.adapt(self.now)
+        self.insert(User, (
+            'id', 'username', 'email', 'first_name', 'last_name',
+            'password', 'is_superuser', 'is_staff', 'is_active',
+            'date_joined', 'updated_at', 'recipes_count', 'subscribers_count',
+        ), (
+            (
+                pk, f'user{pk}', f'user{pk}@example.com', f'Имя{pk}',
+                f'Фамилия{pk}', password, False, False, True, now, now, 0, 0,
+            )
+            for pk in ids
+        ))
+        return ids
+
+    def get_image(self):
+        """Общее изображение рецептов и значение для rendered_image.
+
+        Варианты создаются сразу, а не фоновой задачей на каждый рецепт.
+        """
+        if not default_storage.exists(DATASET_IMAGE):
+            buffer = BytesIO()
+            Image.new('RGB', (1200, 800), (230, 180, 90)).save(buffer, 'JPEG')
+            default_storage.save(DATASET_IMAGE, ContentFile(buffer.getvalue()))
+        image = Recipe(image=DATASET_IMAGE).image
+        generate_renditions(image)
+        rendered = DATASET_IMAGE if has_renditions(image) else ''
+        return DATASET_IMAGE, rendered
+
+    def create_recipes(self, authors):
+        first_id = self.get_next_id(Recipe)
+        ids = list(range(first_id, first_id + self.options['recipes']))
+        owners = self.rng.choices(
+            authors,
+            cum_weights=zipf_weights(len(authors), self.options['skew']),
+            k=len(ids),
+        )
+        image, rendered_image = self.get_image()
+        period = DATASET_PERIOD.total_seconds()
+
+        def build():
+            for pk, author in zip(ids, owners):
+                pub_date = self.adapt(self.now - timedelta(
+                    seconds=self.rng.random() * period
+                ))
+                yield (
+                    pk,
+                    author,
+                    f'{self.rng.choice(ADJECTIVES).capitalize()} '
+                    f'{self.rng.choice(DISHES)} №{pk}',
+                    ' '.join(self.rng.choices(WORDS, k=40)),
+                    self.rng.randint(5, MAX_COOKING_TIME // 20),
+                    image,
+                    rendered_image,
+                    pub_date,
+                    pub_date,
+                    0,
+                )
+
+        self.insert(Recipe, (
+            'id', 'author', 'name', 'text', 'cooking_time', 'image',
+            'rendered_image', 'pub_date', 'updated_at', 'favorites_count',
+        ), build())
+        return ids
+
+    def create_recipe_ingredients(self, recipes, ingredients):
+        mean = self.options['ingredients_per_recipe']
+        self.insert(RecipeIngredient, ('recipe', 'ingredient', 'amount'), (
+            (
+                recipe,
+                ingredient,
+                self.rng.randint(MIN_AMOUNT, MAX_AMOUNT // 200),
+            )
+            for recipe in recipes
+            for ingredient in self.rng.sample(
+                ingredients,
+                min(len(ingredients), self.rng.randint(1, mean * 2 - 1)),
+            )
+        ))
+
+    def create_recipe_tags(self, recipes, tags):
+        self.insert(Recipe.tags.through, ('recipe', 'tag'), (
+            (recipe, tag)
+            for recipe in recipes
+            for tag in self.rng.sample(
+                tags,
+                min(len(tags), self.rng.randint(
+                    1, self.options['tags_per_recipe']
+                )),
+            )
+        ))
+
+    def pick(self, population, weights, mean):
+        """Различные элементы с учётом популярности, в среднем mean штук."""
+        count = min(len(population), round(self.rng.expovariate(1 / mean)))
+        chosen = dict.fromkeys(
+            self.rng.choices(population, cum_weights=weights, k=count)
+        )
+        return list(chosen)
+
+    def create_links(self, model, users, recipes, weights, mean):
+        if not mean:
+            return
+        self.insert(model, ('user', 'recipe'), (
+            (user, recipe)
+            for user in users
+            for recipe in self.pick(recipes, weights, mean)
+        ))
+
+    def create_subscriptions(self, users, authors):
+        mean = self.options['subscriptions']
+        if not mean:
+            return
+        weights = zipf_weights(len(authors), self.options['skew'])
+        self.insert(Subscription, ('user', 'author'), (
+            (user, author)
+            for user in users
+            for author in self.pick(authors, weights, mean)
+            if author != user
+        ))
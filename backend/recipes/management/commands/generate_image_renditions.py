@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe, User
+from recipes.renditions import render_object, rendered_field
+
+
+class Command(BaseCommand):
+    help = "Создание уменьшенных и WebP-вариантов изображений"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать и уже существующие варианты.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options) -> str:
+        created = 0
+        for model, field in ((Recipe, 'image'), (User, 'avatar')):
+            queryset = model.objects.exclude(
+                **{field: ''}
+            ).exclude(
+                **{f'{field}__isnull': True}
+            ).only('pk', field, rendered_field(field))
+            for instance in queryset.iterator(
+                chunk_size=options['chunk_size']
+            ):
+                created += render_object(
+                    instance, field, force=options['force']
+                )
+        return f"Создано вариантов изображений: {created}"
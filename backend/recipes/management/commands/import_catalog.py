@@ -0,0 +1,80 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from api.recipes import cache
+from recipes.catalog import CatalogImporter, read_lines
+from recipes.constants import CATALOG_CHUNK_SIZE
+from recipes.loaders import batched
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Загрузка каталога рецептов из NDJSON-выгрузки export_catalog"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--batch-size', type=int, default=CATALOG_CHUNK_SIZE
+        )
+        parser.add_argument(
+            '--author',
+            help='Email автора для рецептов, чьих авторов нет в базе.',
+        )
+        parser.add_argument(
+            '--id-map',
+            help='CSV-файл для пар "id в выгрузке,новый id".',
+        )
+
+    def handle(self, *args, **options) -> str:
+        default_author = None
+        if options['author']:
+            default_author = User.objects.filter(
+                email=options['author']
+            ).first()
+            if default_author is None:
+                raise CommandError(
+                    f"Пользователь {options['author']} не найден"
+                )
+
+        importer = CatalogImporter(default_author)
+        created = failed = 0
+        id_map = None
+        try:
+            with open(options['path'], 'rb') as file:
+                if options['id_map']:
+                    id_map = open(
+                        options['id_map'], 'w', encoding='utf-8', newline=''
+                    )
+                for batch in batched(read_lines(file), options['batch_size']):
+                    recipes, errors = importer.resolve(batch)
+                    if recipes:
+                        try:
+                            ids = importer.save(recipes)
+                        except DatabaseError as error:
+                            errors.extend(
+                                (recipe['line'], str(error))
+                                for recipe in recipes
+                            )
+                            recipes, ids = [], []
+                    for line, error in errors:
+                        self.stderr.write(f"Запись {line}: {error}")
+                    if id_map is not None:
+                        csv.writer(id_map).writerows(
+                            (recipe['source_id'], pk)
+                            for recipe, pk in zip(recipes, ids)
+                        )
+                    created += len(recipes)
+                    failed += len(errors)
+        except OSError as error:
+            raise CommandError(error)
+        finally:
+            if id_map is not None:
+                id_map.close()
+            # Пачки фиксируются по отдельности: уже загруженные рецепты
+            # должны попасть в список и при аварийном завершении.
+            if created:
+                cache.invalidate(cache.LIST)
+
+        return f"Загружено рецептов: {created}, с ошибками: {failed}"
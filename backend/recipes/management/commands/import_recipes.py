@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.recipes.bulk import bulk_create_recipes
+from api.recipes.constants import BULK_CREATE_BATCH_SIZE
+from api.recipes.views import get_known_ids
+from recipes.loaders import batched, read_json
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = "Пакетная загрузка рецептов из JSON-массива в формате API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--author', required=True, help='Email автора рецептов.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BULK_CREATE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options) -> str:
+        author = User.objects.filter(email=options['author']).first()
+        if author is None:
+            raise CommandError(f"Пользователь {options['author']} не найден")
+
+        tag_ids, ingredient_ids = get_known_ids()
+        created = failed = 0
+        with open(options['path'], encoding='utf-8') as file:
+            for chunk in batched(read_json(file), options['batch_size']):
+                results = bulk_create_recipes(
+                    [item for _, item in chunk],
+                    author,
+                    tag_ids,
+                    ingredient_ids,
+                    options['batch_size'],
+                )
+                for (line, _), result in zip(chunk, results):
+                    if 'errors' in result:
+                        failed += 1
+                        self.stderr.write(
+                            f"Запись {line}: {result['errors']}"
+                        )
+                    else:
+                        created += 1
+        return f"Создано рецептов: {created}, с ошибками: {failed}"
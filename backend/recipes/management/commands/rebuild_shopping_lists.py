@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Sum
+
+from recipes import shopping_list
+from recipes.models import RecipeIngredient, ShoppingListItem
+
+
+def merge_rows(expected, actual):
+    """Сливает два упорядоченных потока (user, ingredient, amount)."""
+    expected, actual = iter(expected), iter(actual)
+    left, right = next(expected, None), next(actual, None)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left[:2] < right[:2]):
+            yield left[:2], left[2], None
+            left = next(expected, None)
+        elif left is None or right[:2] < left[:2]:
+            yield right[:2], None, right[2]
+            right = next(actual, None)
+        else:
+            yield left[:2], left[2], right[2]
+            left, right = next(expected, None), next(actual, None)
+
+
+class Command(BaseCommand):
+    help = "Пересчёт списков покупок и отчёт о расхождениях"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать расхождения, не исправляя их.',
+        )
+
+    def handle(self, *args, **options) -> str:
+        expected = RecipeIngredient.objects.filter(
+            recipe__shopping_carts__isnull=False,
+        ).values(
+            'ingredient', user=F('recipe__shopping_carts__user'),
+        ).annotate(
+            total=Sum('amount'),
+        ).order_by('user', 'ingredient_id').values_list(
+            'user', 'ingredient_id', 'total',
+        )
+        # По id, а не по полям связи: иначе применится сортировка из
+        # Meta связанных моделей (пользователи упорядочены по username).
+        actual = ShoppingListItem.objects.order_by(
+            'user_id', 'ingredient_id',
+        ).values_list('user_id', 'ingredient_id', 'total_amount')
+
+        drift = 0
+        for (user, ingredient), need, have in merge_rows(
+            expected.iterator(), actual.iterator()
+        ):
+            if need != have:
+                drift += 1
+                self.stdout.write(
+                    f'user={user} ingredient={ingredient}: '
+                    f'ожидалось {need}, в таблице {have}'
+                )
+
+        if not drift:
+            return "Расхождений нет"
+        if options['dry_run']:
+            return f"Найдено расхождений: {drift}"
+
+        with transaction.atomic():
+            shopping_list.rebuild()
+        return f"Исправлено расхождений: {drift}"
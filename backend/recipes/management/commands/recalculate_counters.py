@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.counters import recalculate_counters
+
+
+class Command(BaseCommand):
+    help = "Пересчёт счётчиков рецептов, избранного и подписчиков"
+
+    def handle(self, *args, **options) -> str:
+        with transaction.atomic():
+            recalculate_counters()
+        return "Counters recalculated"
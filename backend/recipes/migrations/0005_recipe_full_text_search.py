@@ -0,0 +1,32 @@
+from django.db import migrations
+
+from recipes.search import (POSTGRES_FORWARD, POSTGRES_REVERSE, SQLITE_FORWARD,
+                            SQLITE_REVERSE)
+
+
+def run_statements(schema_editor, postgres, sqlite):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(postgres)
+    elif vendor == 'sqlite':
+        for statement in sqlite:
+            schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_FORWARD, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    run_statements(schema_editor, POSTGRES_REVERSE, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0004_recipe_pub_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -3,8 +3,8 @@ from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 from .constants import (MAX_AMOUNT, MAX_COOKING_TIME, MAX_DISPLAY_LEN,
-                        MAX_NAME_LEN, MAX_TEXT_LEN, MIN_AMOUNT,
-                        MIN_COOKING_TIME)
+                        MAX_IMAGE_NAME_LEN, MAX_NAME_LEN, MAX_TEXT_LEN,
+                        MIN_AMOUNT, MIN_COOKING_TIME, SHORT_LINK_LENGTH)
 
 User = get_user_model()
 
@@ -91,6 +91,11 @@ class Recipe(StringMixin):
         verbose_name="Дата публикации",
     )
 
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения",
+    )
+
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -109,6 +114,13 @@ class Recipe(StringMixin):
         upload_to="recipes/",
     )
 
+    rendered_image = models.CharField(
+        max_length=MAX_IMAGE_NAME_LEN,
+        blank=True,
+        editable=False,
+        verbose_name="Изображение с готовыми вариантами",
+    )
+
     ingredients = models.ManyToManyField(
         Ingredient,
         through="RecipeIngredient",
@@ -116,10 +128,22 @@ class Recipe(StringMixin):
         related_name="recipes",
     )
 
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="В избранном",
+    )
+
     class Meta:
         verbose_name = "Рецепт"
         verbose_name_plural = "Рецепты"
         ordering = ("-pub_date",)
+        indexes = [
+            models.Index(
+                fields=['-pub_date', 'id'],
+                name='recipe_pub_date_id_idx',
+            ),
+        ]
 
 
 class RecipeIngredient(models.Model):
@@ -212,3 +236,69 @@ class ShoppingCart(FavoriteCartMixin):
                 name="unique_shopping_cart",
             ),
         ]
+
+
+class ShoppingListItem(models.Model):
+    """Суммарное количество ингредиента в корзине пользователя."""
+
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+    )
+
+    ingredient = models.ForeignKey(
+        Ingredient,
+        verbose_name='Ингредиент',
+        on_delete=models.CASCADE,
+    )
+
+    total_amount = models.PositiveIntegerField(
+        verbose_name="Количество",
+    )
+
+    class Meta:
+        verbose_name = "Позиция списка покупок"
+        verbose_name_plural = "Списки покупок"
+        default_related_name = "shopping_list_items"
+        ordering = ("id",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'ingredient'],
+                name="unique_shopping_list_item",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.ingredient}: {self.total_amount}"
+
+
+class ShortLink(models.Model):
+    """Короткая ссылка на рецепт."""
+
+    code = models.CharField(
+        max_length=SHORT_LINK_LENGTH,
+        unique=True,
+        verbose_name="Код",
+    )
+
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name="short_link",
+        verbose_name="Рецепт",
+    )
+
+    hits = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Переходы",
+    )
+
+    class Meta:
+        verbose_name = "Короткая ссылка"
+        verbose_name_plural = "Короткие ссылки"
+        ordering = ("id",)
+
+    def __str__(self):
+        return f"{self.code} -> {self.recipe_id}"
@@ -0,0 +1,172 @@
+"""Уменьшенные копии и WebP-варианты загруженных изображений.
+
+Имена копий однозначно выводятся из полного имени оригинала, вместе с
+его расширением: renditions/<путь оригинала>_<вариант>.<расширение>.
+Когда фоновая задача создала копии, имя оригинала записывается в поле
+rendered_<поле изображения>; пока оно не совпадает с текущим файлом,
+вместо копий отдаются ссылки на оригинал. Хранилище при построении
+ссылок не опрашивается.
+"""
+import logging
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .constants import (IMAGE_RENDITION_QUALITY, IMAGE_RENDITIONS,
+                        IMAGE_RENDITIONS_DIR)
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+
+
+def get_rendition_name(name, rendition):
+    extension = EXTENSIONS[IMAGE_RENDITIONS[rendition]['format']]
+    return f'{IMAGE_RENDITIONS_DIR}/{name}_{rendition}.{extension}'
+
+
+def rendered_field(field):
+    """Поле с именем файла, для которого созданы варианты."""
+    return f'rendered_{field}'
+
+
+def get_rendition_urls(instance, field):
+    """Ссылки на все варианты изображения из поля field объекта.
+
+    Пустой словарь, если файла нет; ссылки на оригинал, пока варианты
+    текущего файла не созданы.
+    """
+    image = getattr(instance, field)
+    if not image:
+        return {}
+    ready = getattr(instance, rendered_field(field)) == image.name
+    return {
+        rendition: image.storage.url(
+            get_rendition_name(image.name, rendition) if ready
+            else image.name
+        )
+        for rendition in IMAGE_RENDITIONS
+    }
+
+
+def has_renditions(image):
+    """Есть ли в хранилище все варианты изображения."""
+    return all(
+        image.storage.exists(get_rendition_name(image.name, rendition))
+        for rendition in IMAGE_RENDITIONS
+    )
+
+
+def remember_stored_name(instance, field):
+    """Запоминает имя файла из поля field, записанное сейчас в базе.
+
+    Вызывается из pre_save, чтобы после сохранения понять, сменился ли
+    файл.
+    """
+    stored = None
+    if instance.pk is not None:
+        stored = type(instance)._base_manager.filter(
+            pk=instance.pk
+        ).values_list(field, flat=True).first()
+    setattr(instance, f'_stored_{field}', stored)
+
+
+def file_changed(instance, field):
+    """Сохранён ли в поле field новый файл (для post_save)."""
+    name = getattr(instance, field).name
+    return bool(name) and name != getattr(instance, f'_stored_{field}', None)
+
+
+def render(original, spec):
+    image = original.copy()
+    if spec['crop']:
+        image = ImageOps.fit(image, spec['size'], Image.Resampling.LANCZOS)
+    else:
+        image.thumbnail(spec['size'], Image.Resampling.LANCZOS)
+
+    if spec['format'] == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    buffer = BytesIO()
+    image.save(
+        buffer, spec['format'], quality=IMAGE_RENDITION_QUALITY, optimize=True
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def generate_renditions(image, force=False):
+    """Создаёт недостающие варианты изображения.
+
+    Возвращает количество созданных файлов. Ошибки обработки не
+    прерывают сохранение модели: оригинал остаётся доступен.
+    """
+    if not image:
+        return 0
+
+    storage = image.storage
+    names = {
+        rendition: get_rendition_name(image.name, rendition)
+        for rendition in IMAGE_RENDITIONS
+    }
+    if not force:
+        names = {
+            rendition: name for rendition, name in names.items()
+            if not storage.exists(name)
+        }
+    if not names:
+        return 0
+
+    try:
+        with storage.open(image.name) as file, Image.open(file) as original:
+            original = ImageOps.exif_transpose(original)
+            for rendition, name in names.items():
+                content = render(original, IMAGE_RENDITIONS[rendition])
+                if storage.exists(name):
+                    storage.delete(name)
+                storage.save(name, content)
+    except (OSError, ValueError):
+        logger.exception('Не удалось обработать изображение %s', image.name)
+        return 0
+    return len(names)
+
+
+def render_object(instance, field, force=False):
+    """Создаёт варианты изображения из поля field и отмечает их готовность.
+
+    Файлы пересоздаются, даже если уже есть: под тем же именем мог
+    лежать удалённый ранее оригинал. Сохранение сдвигает updated_at и
+    отправляет post_save, так что валидаторы и кэш ответов обновляются.
+    """
+    image = getattr(instance, field)
+    rendered = rendered_field(field)
+    if not image or (not force and getattr(instance, rendered) == image.name):
+        return 0
+    created = generate_renditions(image, force=True)
+    if created:
+        setattr(instance, rendered, image.name)
+        instance.save(update_fields=[rendered, 'updated_at'])
+    return created
+
+
+def generate_object_renditions(model, pk, field, force=False):
+    """Фоновая задача: варианты изображения из поля field объекта."""
+    instance = apps.get_model(model).objects.filter(pk=pk).only(
+        field, rendered_field(field)
+    ).first()
+    if instance is None:
+        return 0
+    return render_object(instance, field, force=force)
+
+
+def generate_objects_renditions(model, pks, field, force=False):
+    """Фоновая задача: варианты изображений нескольких объектов."""
+    return sum(
+        render_object(instance, field, force=force)
+        for instance in apps.get_model(model).objects.filter(
+            pk__in=pks
+        ).only(field, rendered_field(field))
+    )
@@ -0,0 +1,152 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .constants import SEARCH_CONFIG
+
+RECIPE_TABLE = 'recipes_recipe'
+FTS_TABLE = 'recipes_recipe_fts'
+
+POSTGRES_FORWARD = f"""
+ALTER TABLE recipes_recipe ADD COLUMN search_vector tsvector;
+
+CREATE FUNCTION recipes_recipe_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.name, '')), 'A')
+        || setweight(
+            to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.text, '')), 'B'
+        );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER recipes_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, text ON recipes_recipe
+    FOR EACH ROW EXECUTE FUNCTION recipes_recipe_search_vector_update();
+
+UPDATE recipes_recipe SET name = name;
+
+CREATE INDEX recipes_recipe_search_vector_idx
+    ON recipes_recipe USING gin (search_vector);
+"""
+
+POSTGRES_REVERSE = """
+DROP TRIGGER IF EXISTS recipes_recipe_search_vector_trigger ON recipes_recipe;
+DROP FUNCTION IF EXISTS recipes_recipe_search_vector_update();
+ALTER TABLE recipes_recipe DROP COLUMN IF EXISTS search_vector;
+"""
+
+# SQLite пересоздаёт таблицу при изменении схемы и теряет триггеры,
+# поэтому они создаются идемпотентно и восстанавливаются после migrate.
+SQLITE_FORWARD = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS recipes_recipe_fts USING fts5(
+        name, text, content='recipes_recipe', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_insert
+    AFTER INSERT ON recipes_recipe
+    BEGIN
+        INSERT INTO recipes_recipe_fts(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_delete
+    AFTER DELETE ON recipes_recipe
+    BEGIN
+        INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipes_recipe_fts_update
+    AFTER UPDATE OF name, text ON recipes_recipe
+    BEGIN
+        INSERT INTO recipes_recipe_fts(recipes_recipe_fts, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+        INSERT INTO recipes_recipe_fts(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    """,
+    "INSERT INTO recipes_recipe_fts(recipes_recipe_fts) VALUES ('rebuild')",
+)
+
+SQLITE_REVERSE = (
+    'DROP TRIGGER IF EXISTS recipes_recipe_fts_insert',
+    'DROP TRIGGER IF EXISTS recipes_recipe_fts_delete',
+    'DROP TRIGGER IF EXISTS recipes_recipe_fts_update',
+    'DROP TABLE IF EXISTS recipes_recipe_fts',
+)
+
+
+def install_sqlite_search_index(connection):
+    """Создаёт (или восстанавливает) таблицу FTS5 и её триггеры."""
+    with connection.cursor() as cursor:
+        for statement in SQLITE_FORWARD:
+            cursor.execute(statement)
+
+
+def get_search_terms(query):
+    """Разбивает поисковую строку на слова без служебных символов."""
+    return re.findall(r'\w+', query)
+
+
+def is_ranked(queryset):
+    """Упорядочены ли рецепты по релевантности (search_recipes)."""
+    return 'search_rank' in queryset.query.annotations
+
+
+def search_recipes(queryset, query):
+    """Полнотекстовый поиск рецептов по названию и тексту.
+
+    Каждое слово ищется по префиксу, все слова обязательны. Рецепты
+    аннотируются полем search_rank (чем больше, тем релевантнее).
+    PostgreSQL использует поле search_vector с GIN-индексом, SQLite —
+    таблицу FTS5, остальные СУБД — обычный icontains без ранжирования.
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        match_sql = (
+            f'{RECIPE_TABLE}.search_vector '
+            f"@@ to_tsquery('{SEARCH_CONFIG}', %s)"
+        )
+        rank_sql = (
+            f'ts_rank({RECIPE_TABLE}.search_vector, '
+            f"to_tsquery('{SEARCH_CONFIG}', %s))"
+        )
+        params = (tsquery,)
+    elif vendor == 'sqlite':
+        fts_query = ' '.join(
+            '"{}"*'.format(term.replace('"', '""')) for term in terms
+        )
+        match_sql = (
+            f'{RECIPE_TABLE}.id IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        )
+        rank_sql = (
+            f'(SELECT -bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'AND {FTS_TABLE}.rowid = {RECIPE_TABLE}.id)'
+        )
+        params = (fts_query,)
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= Q(name__icontains=term) | Q(text__icontains=term)
+        return queryset.filter(condition)
+
+    return queryset.filter(
+        RawSQL(match_sql, params, output_field=BooleanField())
+    ).annotate(
+        search_rank=RawSQL(rank_sql, params, output_field=FloatField())
+    ).order_by('-search_rank', *queryset.model._meta.ordering)
@@ -0,0 +1,120 @@
+"""Поддержка агрегата ShoppingListItem в актуальном состоянии.
+
+Функции вызываются в той же транзакции, что и изменение корзины или
+состава рецепта, и выполняют по одному-два SQL-запроса независимо от
+количества ингредиентов и пользователей.
+"""
+from django.db import connection
+from django.db.models import F, OuterRef, Subquery, Sum
+
+from .models import RecipeIngredient, ShoppingCart, ShoppingListItem
+
+ITEM_TABLE = ShoppingListItem._meta.db_table
+CART_TABLE = ShoppingCart._meta.db_table
+RECIPE_INGREDIENT_TABLE = RecipeIngredient._meta.db_table
+
+ADD_SQL = f"""
+INSERT INTO {ITEM_TABLE} (user_id, ingredient_id, total_amount)
+SELECT cart.user_id, ri.ingredient_id, ri.amount
+FROM {CART_TABLE} cart
+JOIN {RECIPE_INGREDIENT_TABLE} ri ON ri.recipe_id = cart.recipe_id
+WHERE cart.recipe_id = %s {{user_condition}}
+ON CONFLICT (user_id, ingredient_id) DO UPDATE
+SET total_amount = {ITEM_TABLE}.total_amount + excluded.total_amount
+"""
+
+ADD_TO_USER_SQL = f"""
+INSERT INTO {ITEM_TABLE} (user_id, ingredient_id, total_amount)
+SELECT %s, ri.ingredient_id, SUM(ri.amount)
+FROM {RECIPE_INGREDIENT_TABLE} ri
+WHERE ri.recipe_id IN ({{placeholders}})
+GROUP BY ri.ingredient_id
+ON CONFLICT (user_id, ingredient_id) DO UPDATE
+SET total_amount = {ITEM_TABLE}.total_amount + excluded.total_amount
+"""
+
+REBUILD_SQL = f"""
+INSERT INTO {ITEM_TABLE} (user_id, ingredient_id, total_amount)
+SELECT cart.user_id, ri.ingredient_id, SUM(ri.amount)
+FROM {CART_TABLE} cart
+JOIN {RECIPE_INGREDIENT_TABLE} ri ON ri.recipe_id = cart.recipe_id
+GROUP BY cart.user_id, ri.ingredient_id
+"""
+
+
+def add_recipe(recipe, user=None):
+    """Прибавляет ингредиенты рецепта к спискам покупок.
+
+    Учитываются корзины, в которых уже лежит рецепт: одного пользователя
+    или всех, если user не указан.
+    """
+    params = [recipe.pk]
+    user_condition = ''
+    if user is not None:
+        user_condition = 'AND cart.user_id = %s'
+        params.append(user.pk)
+
+    with connection.cursor() as cursor:
+        cursor.execute(ADD_SQL.format(user_condition=user_condition), params)
+
+
+def remove_recipe(recipe, user=None):
+    """Вычитает ингредиенты рецепта из списков покупок.
+
+    Вызывается до удаления рецепта из корзины (или до изменения его
+    состава), пока строки корзины ещё существуют.
+    """
+    carts = ShoppingCart.objects.filter(recipe=recipe)
+    if user is not None:
+        carts = carts.filter(user=user)
+
+    recipe_ingredients = RecipeIngredient.objects.filter(recipe=recipe)
+    amount = Subquery(recipe_ingredients.filter(
+        ingredient=OuterRef('ingredient')
+    ).values('amount')[:1])
+    items = ShoppingListItem.objects.filter(
+        user__in=carts.values('user'),
+        ingredient__in=recipe_ingredients.values('ingredient'),
+    )
+    items.filter(total_amount__lte=amount).delete()
+    items.update(total_amount=F('total_amount') - amount)
+
+
+def add_recipes_to_user(recipe_ids, user):
+    """Прибавляет ингредиенты нескольких рецептов к списку покупок user."""
+    if not recipe_ids:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            ADD_TO_USER_SQL.format(
+                placeholders=', '.join(['%s'] * len(recipe_ids))
+            ),
+            [user.pk, *recipe_ids],
+        )
+
+
+def remove_recipes_from_user(recipe_ids, user):
+    """Вычитает ингредиенты нескольких рецептов из списка покупок user."""
+    if not recipe_ids:
+        return
+    recipe_ingredients = RecipeIngredient.objects.filter(
+        recipe__in=recipe_ids
+    )
+    amount = Subquery(recipe_ingredients.filter(
+        ingredient=OuterRef('ingredient')
+    ).order_by().values('ingredient').annotate(
+        total=Sum('amount')
+    ).values('total'))
+    items = ShoppingListItem.objects.filter(
+        user=user,
+        ingredient__in=recipe_ingredients.values('ingredient'),
+    )
+    items.filter(total_amount__lte=amount).delete()
+    items.update(total_amount=F('total_amount') - amount)
+
+
+def rebuild():
+    """Пересчитывает все списки покупок с нуля."""
+    ShoppingListItem.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(REBUILD_SQL)
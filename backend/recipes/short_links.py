@@ -0,0 +1,180 @@
+"""Короткие ссылки на рецепты.
+
+Код — случайная строка base62, не связанная с id рецепта. Разрешённые
+коды, в том числе несуществующие, хранятся в LRU-кэше процесса, так что
+повторные переходы не обращаются к базе. Удаление ссылки сбрасывает
+запись в своём процессе, в остальных она устаревает через
+SHORT_LINK_CACHE_TTL. Переходы накапливаются в памяти и записываются в
+базу одним UPDATE раз в SHORT_LINK_FLUSH_INTERVAL секунд.
+
+Старые ссылки вида /s/0x1f/ (id рецепта в шестнадцатеричной записи)
+продолжают работать, если такой рецепт существует.
+"""
+import atexit
+import logging
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.db import DatabaseError, IntegrityError, models, transaction
+
+from .constants import (SHORT_LINK_ALPHABET, SHORT_LINK_CACHE_SIZE,
+                        SHORT_LINK_CACHE_TTL, SHORT_LINK_FLUSH_INTERVAL,
+                        SHORT_LINK_FLUSH_SIZE, SHORT_LINK_LEGACY_BASE,
+                        SHORT_LINK_LENGTH)
+from .models import Recipe, ShortLink
+
+logger = logging.getLogger(__name__)
+
+LEGACY_PREFIX = '0x'
+CREATE_ATTEMPTS = 5
+MISSING = object()
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш с ограниченным временем жизни записей."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class HitCounter:
+    """Переходы по ссылкам, накопленные в памяти процесса."""
+
+    def __init__(self, flush_interval, flush_size):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._flushed_at = time.monotonic()
+
+    def add(self, code):
+        with self._lock:
+            self._counts[code] += 1
+
+    def is_due(self):
+        return bool(self._counts) and (
+            len(self._counts) >= self.flush_size
+            or time.monotonic() - self._flushed_at >= self.flush_interval
+        )
+
+    def flush(self):
+        """Записывает накопленные переходы; возвращает их количество."""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._flushed_at = time.monotonic()
+        if not counts:
+            return 0
+
+        try:
+            ShortLink.objects.filter(code__in=counts).update(
+                hits=models.F('hits') + models.Case(
+                    *(
+                        models.When(code=code, then=models.Value(count))
+                        for code, count in counts.items()
+                    ),
+                    output_field=models.PositiveBigIntegerField(),
+                )
+            )
+        except DatabaseError:
+            logger.exception('Не удалось записать переходы по ссылкам')
+            with self._lock:
+                self._counts.update(counts)
+            return 0
+        return sum(counts.values())
+
+
+resolved = LRUCache(SHORT_LINK_CACHE_SIZE, SHORT_LINK_CACHE_TTL)
+hits = HitCounter(SHORT_LINK_FLUSH_INTERVAL, SHORT_LINK_FLUSH_SIZE)
+atexit.register(hits.flush)
+
+
+def generate_code():
+    return ''.join(
+        secrets.choice(SHORT_LINK_ALPHABET) for _ in range(SHORT_LINK_LENGTH)
+    )
+
+
+def get_code(recipe):
+    """Код короткой ссылки рецепта; создаётся при первом обращении."""
+    codes = ShortLink.objects.filter(recipe=recipe).values_list(
+        'code', flat=True
+    )
+    for attempt in range(CREATE_ATTEMPTS):
+        code = codes.first()
+        if code is not None:
+            return code
+        try:
+            with transaction.atomic():
+                link = ShortLink.objects.create(
+                    recipe=recipe, code=generate_code()
+                )
+        except IntegrityError:
+            # Код занят или ссылку только что создал другой запрос.
+            if attempt == CREATE_ATTEMPTS - 1:
+                raise
+            continue
+        resolved.set(link.code, recipe.pk)
+        return link.code
+
+
+def get_legacy_recipe_pk(code):
+    if not code.startswith(LEGACY_PREFIX):
+        return None
+    try:
+        recipe_pk = int(code, SHORT_LINK_LEGACY_BASE)
+    except ValueError:
+        return None
+    return recipe_pk if Recipe.objects.filter(pk=recipe_pk).exists() else None
+
+
+def resolve(code):
+    """id рецепта по коду или None, если ссылки нет."""
+    recipe_pk = resolved.get(code)
+    if recipe_pk is not MISSING:
+        return recipe_pk
+
+    recipe_pk = ShortLink.objects.filter(code=code).values_list(
+        'recipe_id', flat=True
+    ).first()
+    if recipe_pk is None:
+        recipe_pk = get_legacy_recipe_pk(code)
+    resolved.set(code, recipe_pk)
+    return recipe_pk
+
+
+def record_hit(code):
+    hits.add(code)
+    if hits.is_due():
+        hits.flush()
+
+
+def forget(code):
+    resolved.delete(code)
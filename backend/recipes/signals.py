@@ -0,0 +1,79 @@
+from django.db import connections
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import counters, shopping_list, short_links
+from .ingredient_index import ingredient_index
+from .models import Favorite, Ingredient, Recipe, ShortLink, User
+from .renditions import (file_changed, generate_object_renditions,
+                         remember_stored_name)
+from .search import RECIPE_TABLE, install_sqlite_search_index
+from jobs.queue import enqueue
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    ingredient_index.invalidate()
+
+
+@receiver(post_delete, sender=ShortLink)
+def forget_short_link(sender, instance, **kwargs):
+    short_links.forget(instance.code)
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_legacy_short_link(sender, instance, **kwargs):
+    short_links.forget(hex(instance.pk))
+
+
+@receiver(pre_delete, sender=Recipe)
+def remove_recipe_from_shopping_lists(sender, instance, **kwargs):
+    shopping_list.remove_recipe(instance)
+
+
+@receiver(post_save, sender=Recipe)
+def increment_recipes_count(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(User, instance.author_id, 'recipes_count')
+
+
+@receiver(pre_save, sender=Recipe)
+def remember_image(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'image' in update_fields:
+        remember_stored_name(instance, 'image')
+
+
+@receiver(post_save, sender=Recipe)
+def create_image_renditions(sender, instance, update_fields=None, **kwargs):
+    if (
+        update_fields is None or 'image' in update_fields
+    ) and file_changed(instance, 'image'):
+        enqueue(
+            generate_object_renditions, 'recipes.Recipe', instance.pk, 'image'
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def decrement_recipes_count(sender, instance, **kwargs):
+    counters.decrement(User, instance.author_id, 'recipes_count')
+
+
+@receiver(post_save, sender=Favorite)
+def increment_favorites_count(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(Recipe, instance.recipe_id, 'favorites_count')
+
+
+@receiver(post_delete, sender=Favorite)
+def decrement_favorites_count(sender, instance, **kwargs):
+    counters.decrement(Recipe, instance.recipe_id, 'favorites_count')
+
+
+def restore_sqlite_search_index(sender, using, **kwargs):
+    connection = connections[using]
+    if (
+        connection.vendor == 'sqlite'
+        and RECIPE_TABLE in connection.introspection.table_names()
+    ):
+        install_sqlite_search_index(connection)
@@ -0,0 +1,72 @@
+"""Добавление рецептов в избранное и корзину и удаление из них.
+
+Каждая операция — один INSERT ... ON CONFLICT DO NOTHING или DELETE с
+RETURNING, поэтому параллельные запросы не добавят и не удалят рецепт
+дважды, а возвращаются ровно те id, что изменились. Сигналы при этом не
+отправляются: счётчик favorites_count и агрегат списка покупок
+обновляются здесь, в той же транзакции.
+"""
+from django.db import connection, transaction
+
+from . import counters, shopping_list
+from .models import Favorite, Recipe, ShoppingCart
+
+RECIPE_TABLE = Recipe._meta.db_table
+
+ADD_SQL = """
+INSERT INTO {table} (user_id, recipe_id)
+SELECT %s, recipe.id FROM {recipe_table} recipe
+WHERE recipe.id IN ({placeholders})
+ON CONFLICT (user_id, recipe_id) DO NOTHING
+RETURNING recipe_id
+"""
+
+REMOVE_SQL = """
+DELETE FROM {table}
+WHERE user_id = %s AND recipe_id IN ({placeholders})
+RETURNING recipe_id
+"""
+
+
+def execute(sql, model, user, recipe_ids):
+    if not recipe_ids:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.format(
+                table=model._meta.db_table,
+                recipe_table=RECIPE_TABLE,
+                placeholders=', '.join(['%s'] * len(recipe_ids)),
+            ),
+            [user.pk, *recipe_ids],
+        )
+        return sorted(recipe_id for recipe_id, in cursor.fetchall())
+
+
+@transaction.atomic
+def add(model, user, recipe_ids):
+    """Добавляет рецепты в Favorite или ShoppingCart пользователя.
+
+    Несуществующие и уже добавленные рецепты пропускаются. Возвращает
+    id добавленных.
+    """
+    added = execute(ADD_SQL, model, user, recipe_ids)
+    if model is Favorite:
+        counters.increment_many(Recipe, added, 'favorites_count')
+    elif model is ShoppingCart:
+        shopping_list.add_recipes_to_user(added, user)
+    return added
+
+
+@transaction.atomic
+def remove(model, user, recipe_ids):
+    """Удаляет рецепты из Favorite или ShoppingCart пользователя.
+
+    Возвращает id удалённых.
+    """
+    removed = execute(REMOVE_SQL, model, user, recipe_ids)
+    if model is Favorite:
+        counters.decrement_many(Recipe, removed, 'favorites_count')
+    elif model is ShoppingCart:
+        shopping_list.remove_recipes_from_user(removed, user)
+    return removed
@@ -1,2 +1,3 @@
 MAX_USERNAME_LEN = 20
 MAX_NAME_LEN = 150
+MAX_IMAGE_NAME_LEN = 100  # как у ImageField по умолчанию
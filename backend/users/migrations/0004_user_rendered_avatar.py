@@ -0,0 +1,18 @@
+# Generated by Django 3.2.3 on 2026-10-18 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='rendered_avatar',
+            field=models.CharField(blank=True, editable=False, max_length=100, verbose_name='Фотография с готовыми вариантами'),
+        ),
+    ]
@@ -2,7 +2,7 @@ from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import models
 
-from .constants import MAX_NAME_LEN, MAX_USERNAME_LEN
+from .constants import MAX_IMAGE_NAME_LEN, MAX_NAME_LEN, MAX_USERNAME_LEN
 from .custom_validators import validate_username
 
 
@@ -48,6 +48,30 @@ class User(AbstractUser):
         upload_to="avatars",
     )
 
+    rendered_avatar = models.CharField(
+        max_length=MAX_IMAGE_NAME_LEN,
+        blank=True,
+        editable=False,
+        verbose_name="Фотография с готовыми вариантами",
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Дата изменения",
+    )
+
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество рецептов",
+    )
+
+    subscribers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество подписчиков",
+    )
+
     class Meta:
         ordering = ("username",)
         verbose_name = "Пользователь"
@@ -0,0 +1,35 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Subscription, User
+from jobs.queue import enqueue
+from recipes import counters
+from recipes.renditions import (file_changed, generate_object_renditions,
+                                remember_stored_name)
+
+
+@receiver(post_save, sender=Subscription)
+def increment_subscribers_count(sender, instance, created, **kwargs):
+    if created:
+        counters.increment(User, instance.author_id, 'subscribers_count')
+
+
+@receiver(post_delete, sender=Subscription)
+def decrement_subscribers_count(sender, instance, **kwargs):
+    counters.decrement(User, instance.author_id, 'subscribers_count')
+
+
+@receiver(pre_save, sender=User)
+def remember_avatar(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or 'avatar' in update_fields:
+        remember_stored_name(instance, 'avatar')
+
+
+@receiver(post_save, sender=User)
+def create_avatar_renditions(sender, instance, update_fields=None, **kwargs):
+    if (
+        update_fields is None or 'avatar' in update_fields
+    ) and file_changed(instance, 'avatar'):
+        enqueue(
+            generate_object_renditions, 'users.User', instance.pk, 'avatar'
+        )
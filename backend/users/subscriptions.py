@@ -0,0 +1,54 @@
+"""Подписка на автора и отписка.
+
+Каждая операция — один INSERT ... ON CONFLICT DO NOTHING или один DELETE;
+изменилось ли что-то, видно по числу затронутых строк. Параллельные
+запросы не упираются в уникальное ограничение и не меняют счётчик
+subscribers_count дважды. Сигналы при этом не отправляются, поэтому
+счётчик обновляется здесь, в той же транзакции.
+"""
+from django.db import connection, transaction
+
+from .models import Subscription, User
+from recipes import counters
+
+SUBSCRIBE_SQL = """
+INSERT INTO {table} (user_id, author_id)
+SELECT %s, author.id FROM {user_table} author
+WHERE author.id = %s
+ON CONFLICT (user_id, author_id) DO NOTHING
+"""
+
+UNSUBSCRIBE_SQL = """
+DELETE FROM {table}
+WHERE user_id = %s AND author_id = %s
+"""
+
+
+def execute(sql, user, author_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql.format(
+                table=Subscription._meta.db_table,
+                user_table=User._meta.db_table,
+            ),
+            [user.pk, author_id],
+        )
+        return cursor.rowcount == 1
+
+
+@transaction.atomic
+def subscribe(user, author_id):
+    """Подписывает user на автора; False, если автора нет или уже подписан."""
+    created = execute(SUBSCRIBE_SQL, user, author_id)
+    if created:
+        counters.increment(User, author_id, 'subscribers_count')
+    return created
+
+
+@transaction.atomic
+def unsubscribe(user, author_id):
+    """Отписывает user от автора; False, если подписки не было."""
+    deleted = execute(UNSUBSCRIBE_SQL, user, author_id)
+    if deleted:
+        counters.decrement(User, author_id, 'subscribers_count')
+    return deleted